@@ -7,6 +7,8 @@ Run    : python mavic3_tracker_ui.py --url rtmp://<ip>:1935/live/mavic3
 
 import cv2, numpy as np, argparse, time, sys, scipy.fft
 from collections import OrderedDict
+from video_source import open_capture
+from hud import HudLayer, GlyphCache
 
 # ───────── CLI ─────────
 ap = argparse.ArgumentParser()
@@ -79,10 +81,8 @@ class CentroidTracker:
         return yf[4] / (yf[1] + 1e-6) > 3.0   # >4 Hz energy
 
 # ───────── Video / BG model ─────────
-cap = cv2.VideoCapture(args.url, cv2.CAP_FFMPEG)
+cap = open_capture(args.url, size=(args.width, args.height))
 if not cap.isOpened(): sys.exit("❌ stream error")
-cap.set(cv2.CAP_PROP_FRAME_WIDTH,  args.width)
-cap.set(cv2.CAP_PROP_FRAME_HEIGHT, args.height)
 
 bg  = cv2.createBackgroundSubtractorKNN(history=args.history, detectShadows=False)
 ker = cv2.getStructuringElement(cv2.MORPH_RECT,(3,3))
@@ -91,6 +91,7 @@ ct  = CentroidTracker(args.ttl)
 W,H, DW,DH = args.width,args.height, args.disp_w,args.disp_h
 zoom, zx, zy = 1.0, W//2, H//2
 fps, t0 = 0, time.time()
+fps_glyphs = GlyphCache(cv2.FONT_HERSHEY_SIMPLEX, DW/W, max(1, round(2*DW/W)), cv2.LINE_8)
 
 # ───────── On-screen button bar ─────────
 BTN_H   = 50                 # bar height @ display scale
@@ -115,14 +116,19 @@ def button_at(px,py):
             return label
     return None
 
-def draw_buttons(img):
-    overlay = img.copy()
-    cv2.rectangle(overlay, (0,DH-BTN_H), (DW,DH), (32,32,32), -1)
+# Bar rendered once into a 60 %‑opaque sprite; only its box is blended per frame
+hud = HudLayer(opacity=0.6)
+
+def render_buttons(c):
+    c.rect((0,DH-BTN_H), (DW,DH), (32,32,32), -1)
     for (x1,y1,x2,y2), label in buttons:
-        cv2.rectangle(overlay, (x1,y1), (x2,y2), (180,180,180), 2)
-        cv2.putText(overlay,label,(x1+BTN_PAD,y2-12),
-                    cv2.FONT_HERSHEY_SIMPLEX,1.2,(255,255,255),2)
-    cv2.addWeighted(overlay, 0.6, img, 0.4, 0, img)
+        c.rect((x1,y1), (x2,y2), (180,180,180), 2)
+        c.text(label,(x1+BTN_PAD,y2-12),
+               cv2.FONT_HERSHEY_SIMPLEX,1.2,(255,255,255),2,cv2.LINE_8)
+
+def draw_buttons(img):
+    hud.update((DW,DH), None, render_buttons)
+    hud.composite(img)
 
 cv2.namedWindow("Mavic-3 Tracker")
 
@@ -163,10 +169,10 @@ while True:
         x1 = max(0,min(zx-w2//2,W-w2)); y1 = max(0,min(zy-h2//2,H-h2))
         frame = cv2.resize(frame[y1:y1+h2,x1:x1+w2], (W,H))
 
-    # HUD & down-scale
+    # Down-scale & HUD (FPS text drawn at display scale from cached glyphs)
     fps = 0.9*fps + 0.1*(1/(time.time()-t0));  t0 = time.time()
-    cv2.putText(frame,f"{fps:4.1f} fps",(10,40),cv2.FONT_HERSHEY_SIMPLEX,1,(255,255,255),2)
     disp = cv2.resize(frame,(DW,DH))
+    fps_glyphs.draw(disp,f"{fps:4.1f} fps",(10*DW//W,40*DH//H),(255,255,255))
 
     draw_buttons(disp)
     cv2.imshow("Mavic-3 Tracker", disp)
@@ -1,48 +1,95 @@
 """
-Mavic 3 Target‑Acquisition Viewer (Ultralytics YOLO v8‑s • .pt)
+Mavic 3 Target‑Acquisition Viewer (YOLO v8 • .onnx)
 
 Detects people, vehicles and animals from the drone’s RTMP stream.
-Runs on CPU or GPU; no ONNX/OpenCV compatibility headaches.
+Runs the ONNX export on the CPU through detector.py (onnxruntime if installed,
+else cv2.dnn) — no torch import, so it starts in well under a second.
+Detection runs on a worker thread against the newest frame; between results
+the boxes follow the picture by optical flow (async_detect.py), so video
+renders at stream rate whatever the inference rate.
+DETECT_MODE "tiled" detects on overlapping native‑res 640 px tiles of the full
+frame (small targets from altitude) instead of one shrunken copy; "gated"
+runs YOLO only on crops around moving blobs, with a full‑frame pass every
+GATE_REFRESH inferences.  Either way the picture is still shown and tracked at
+WIN_W × WIN_H.
 """
 
 import cv2
 import numpy as np
 import time
 from collections import deque
-from ultralytics import YOLO
+from video_source import open_capture
+from detector import Detector, TiledDetector, MotionGatedDetector
+from model_zoo import pick
+from async_detect import DetectorThread, FlowTracker
 
 # ── User config ────────────────────────────────────────────────────
 RTMP_URL    = "rtmp://127.0.0.1:1935/live/mavic3"
-MODEL_PATH = "yolov8n.pt"          # downloaded in step 2
+MODEL_PATH   = "yolov8n.onnx"       # or yolov8s.onnx / yolo_nas_s.onnx
 WINDOW_NAME = "Mavic3 — YOLOv8 TargetAcq"
 WIN_W, WIN_H = 1280, 720
 CONF_THRESH  = 0.35
+NMS_THRESH   = 0.45
+AUTO_FPS     = None                 # e.g. 10 → most accurate bundled model reaching 10 fps
+                                    # here (model_zoo.py; benchmarked once, then cached)
+BENCH_CLIP   = None                 # recorded flight the AUTO_FPS benchmark replays
+                                    # (None → synthetic noise frames)
+DETECT_MODE  = "full"               # "full" | "tiled" | "gated" (see above)
+TILE_OVERLAP = 96                   # tiled: px shared by neighbouring tiles
+SKIP_STATIC  = True                 # tiled: reuse detections of unchanged tiles
+GATE_REFRESH = 15                   # gated: full‑frame pass every N inferences
+GATE_CROPS   = 4                    # gated: at most N crops per pass, else a full pass
 TARGET_SET   = {
     "person", "car", "bus", "truck", "motorcycle",
     "dog", "cat", "bird", "horse", "cow", "sheep", "deer", "bear"
 }
 # ───────────────────────────────────────────────────────────────────
 
-# 1.  Load the model on appropriate device for performance
-import torch
-device = 'cuda' if torch.cuda.is_available() else 'cpu'
-model = YOLO(MODEL_PATH, device=device)
-
-# 2.  Open the RTMP stream
-cap = cv2.VideoCapture(RTMP_URL, cv2.CAP_FFMPEG)
+# 1.  Open the RTMP stream (full res only for tiled / gated detection)
+FULL_RES = DETECT_MODE != "full"
+cap = open_capture(RTMP_URL, size=None if FULL_RES else (WIN_W, WIN_H))
 if not cap.isOpened():
     raise RuntimeError(f"Could not open RTMP stream at {RTMP_URL}")
 
+# 2.  Load the model (only TARGET_SET classes survive decoding).  AUTO_FPS is
+#     a budget per detection call: tiled runs one pass per tile, gated up to
+#     GATE_CROPS (batched, so a conservative count)
+if AUTO_FPS:
+    if DETECT_MODE == "tiled":
+        src_w = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)) or 3840
+        src_h = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)) or 2160
+        cost = lambda name, size: TiledDetector.count(src_w, src_h, size, TILE_OVERLAP)
+    elif DETECT_MODE == "gated":
+        cost = lambda name, size: GATE_CROPS
+    else:
+        cost = None
+    model = pick(AUTO_FPS, BENCH_CLIP, kinds=None if DETECT_MODE == "full" else ("onnx",),
+                 cost=cost, classes=TARGET_SET, conf=CONF_THRESH, iou=NMS_THRESH)
+else:
+    model = Detector(MODEL_PATH, classes=TARGET_SET, conf=CONF_THRESH, iou=NMS_THRESH)
+if FULL_RES:
+    if DETECT_MODE == "tiled":
+        native = TiledDetector(model, TILE_OVERLAP, SKIP_STATIC)
+    else:
+        native = MotionGatedDetector(model, GATE_REFRESH, max_crops=GATE_CROPS)
+
+    def detect(full):
+        """Full‑res frame → boxes in display px."""
+        dets = native(full)
+        dets[:, [0, 2]] *= WIN_W / full.shape[1]
+        dets[:, [1, 3]] *= WIN_H / full.shape[0]
+        return dets
+else:
+    detect = model
+
 # 3.  Prepare display window
 cv2.namedWindow(WINDOW_NAME, cv2.WINDOW_NORMAL)
 cv2.resizeWindow(WINDOW_NAME, WIN_W, WIN_H)
 cv2.setWindowProperty(WINDOW_NAME, cv2.WND_PROP_TOPMOST, 1)
 
 fps_hist, prev_t = deque(maxlen=30), time.time()
-# Performance: only run detection every N frames
-DETECT_EVERY_N_FRAMES = 2
-frame_count = 0
-last_results = None
+worker  = DetectorThread(detect)    # YOLO at whatever rate the CPU allows
+tracker = FlowTracker()             # carries boxes between (and across) inferences
 
 # 4.  Main loop
 while True:
@@ -51,26 +98,17 @@ while True:
         print("⚠️  Stream ended or cannot read frame.")
         break
 
-    # Resize frame for faster inference
-    frame = cv2.resize(frame, (WIN_W, WIN_H))
-
-    # Controlled inference for performance
-    frame_count += 1
-    do_detect = (frame_count == 1) or (frame_count % DETECT_EVERY_N_FRAMES == 0)
-    if do_detect:
-        results = model(frame, verbose=False, imgsz=(640,360), half=device=='cuda')[0]
-        last_results = results
-    else:
-        results = last_results
-
-    for box in results.boxes:
-        conf = float(box.conf)
-        cls  = int(box.cls)
-        name = model.names[cls]
-        if conf < CONF_THRESH or name not in TARGET_SET:
-            continue
+    # Hand the frame to the detector if it is idle, then move the boxes
+    full = frame
+    if FULL_RES:
+        frame = cv2.resize(full, (WIN_W, WIN_H), interpolation=cv2.INTER_AREA)
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    worker.submit(full, gray)
+    results = tracker.update(gray, worker.poll())   # (n, 6): x1, y1, x2, y2, conf, class_id
 
-        x1, y1, x2, y2 = map(int, box.xyxy[0])
+    for x1, y1, x2, y2, conf, cls in results:
+        name = model.names[int(cls)]
+        x1, y1, x2, y2 = int(x1), int(y1), int(x2), int(y2)
         color = (0, 255, 0)
         cv2.rectangle(frame, (x1, y1), (x2, y2), color, 2)
         cx, cy = (x1 + x2) // 2, (y1 + y2) // 2
@@ -82,7 +120,8 @@ while True:
     now = time.time()
     fps_hist.append(1 / (now - prev_t))
     prev_t = now
-    cv2.putText(frame, f"FPS {sum(fps_hist)/len(fps_hist):.1f}",
+    det_mode = f" ({native.mode})" if DETECT_MODE == "gated" else ""
+    cv2.putText(frame, f"FPS {sum(fps_hist)/len(fps_hist):.1f}  DET {worker.rate:.1f}/s{det_mode}",
                 (10, 30), cv2.FONT_HERSHEY_SIMPLEX,
                 0.9, (0, 255, 255), 2, cv2.LINE_AA)
 
@@ -91,5 +130,6 @@ while True:
         break
 
 # 5.  Cleanup
+worker.stop()
 cap.release()
 cv2.destroyAllWindows()
@@ -1,12 +1,12 @@
 import cv2
-import numpy as np
 import time
 from collections import deque
+from video_source import open_capture
+from detector import DarknetDetector
 
 # ── User config ────────────────────────────────────────────────────
 RTMP_URL     = "rtmp://127.0.0.1:1935/live/mavic3"
-CFG_PATH     = "yolov4.cfg"
-WEIGHTS_PATH = "yolov4.weights"
+PROFILE      = "yolov4"            # "tiny" = yolov4-tiny.cfg/.weights at 416 px, several × faster
 NAMES_PATH   = "coco.names"        # 80 classes
 WINDOW_NAME  = "Mavic3 — YOLOv4 TargetAcq"
 WIN_W, WIN_H = 1280, 720
@@ -17,17 +17,16 @@ TARGET_SET   = set(open(NAMES_PATH).read().strip().splitlines())  # all 80
 # ───────────────────────────────────────────────────────────────────
 
 # 1.  Load the network -------------------------------------------------
-net = cv2.dnn.readNetFromDarknet(CFG_PATH, WEIGHTS_PATH)
+# Outputs of all yolo layers are decoded in one vectorised pass (detector.py);
+# classes outside TARGET_SET are dropped before NMS
+det = DarknetDetector(PROFILE, classes=TARGET_SET, conf=CONF_THRESH, iou=NMS_THRESH)
 # Uncomment to use GPU (needs CUDA‑enabled OpenCV):
-# net.setPreferableBackend(cv2.dnn.DNN_BACKEND_CUDA)
-# net.setPreferableTarget(cv2.dnn.DNN_TARGET_CUDA)
-
-layer_names = net.getLayerNames()
-output_layers = [layer_names[i - 1] for i in net.getUnconnectedOutLayers().flatten()]
-class_names = open(NAMES_PATH).read().strip().splitlines()
+# det.net.setPreferableBackend(cv2.dnn.DNN_BACKEND_CUDA)
+# det.net.setPreferableTarget(cv2.dnn.DNN_TARGET_CUDA)
+class_names = det.names
 
 # 2.  Open the RTMP stream --------------------------------------------
-cap = cv2.VideoCapture(RTMP_URL, cv2.CAP_FFMPEG)
+cap = open_capture(RTMP_URL)
 if not cap.isOpened():
     raise RuntimeError(f"Could not open RTMP stream at {RTMP_URL}")
 
@@ -45,47 +44,19 @@ while True:
         print("⚠️  Stream ended or cannot read frame.")
         break
 
-    h, w = frame.shape[:2]
-
-    # Prepare blob & forward pass
-    blob = cv2.dnn.blobFromImage(frame, 1/255.0, (608, 608),
-                                 swapRB=True, crop=False)
-    net.setInput(blob)
-    layer_outputs = net.forward(output_layers)
-
-    boxes, confidences, class_ids = [], [], []
-
-    for output in layer_outputs:
-        for detection in output:
-            scores = detection[5:]
-            cls_id = int(np.argmax(scores))
-            conf   = scores[cls_id]
-
-            if conf > CONF_THRESH:
-                cx, cy, bw, bh = detection[0:4] * np.array([w, h, w, h])
-                x = int(cx - bw / 2)
-                y = int(cy - bh / 2)
-                boxes.append([x, y, int(bw), int(bh)])
-                confidences.append(float(conf))
-                class_ids.append(cls_id)
-
-    # Non‑max suppression to prune overlaps
-    idxs = cv2.dnn.NMSBoxes(boxes, confidences, CONF_THRESH, NMS_THRESH)
+    # Forward pass + batched decode / NMS → (n, 6): x1, y1, x2, y2, conf, class_id
+    dets = det(frame)
 
     # Draw detections
-    if len(idxs):
-        for i in idxs.flatten():
-            name = class_names[class_ids[i]]
-            if name not in TARGET_SET:
-                continue
-            x, y, bw, bh = boxes[i]
-            x2, y2 = x + bw, y + bh
-            color = (0, 255, 0)
-            cv2.rectangle(frame, (x, y), (x2, y2), color, 2)
-            cx, cy = (x + x2) // 2, (y + y2) // 2
-            cv2.drawMarker(frame, (cx, cy), color, cv2.MARKER_CROSS, 20, 2)
-            cv2.putText(frame, f"{name} {confidences[i]:.0%}", (x, y - 6),
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2, cv2.LINE_AA)
+    for x, y, x2, y2, conf, cls in dets:
+        name = class_names[int(cls)]
+        x, y, x2, y2 = int(x), int(y), int(x2), int(y2)
+        color = (0, 255, 0)
+        cv2.rectangle(frame, (x, y), (x2, y2), color, 2)
+        cx, cy = (x + x2) // 2, (y + y2) // 2
+        cv2.drawMarker(frame, (cx, cy), color, cv2.MARKER_CROSS, 20, 2)
+        cv2.putText(frame, f"{name} {conf:.0%}", (x, y - 6),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2, cv2.LINE_AA)
 
     # FPS overlay
     now = time.time()
@@ -5,6 +5,7 @@ Works on Windows 10/11 + Python ≥ 3.9
 
 import cv2
 import numpy as np
+from video_source import open_capture
 
 # ────────────────────────────────────────────────────────────────────
 # Runtime configuration
@@ -21,7 +22,7 @@ ZOOM_WIN_H    = 270
 # ────────────────────────────────────────────────────────────────────
 
 # Open the RTMP stream (requires FFmpeg support in OpenCV)
-cap = cv2.VideoCapture(RTMP_URL, cv2.CAP_FFMPEG)
+cap = open_capture(RTMP_URL)
 if not cap.isOpened():
     raise RuntimeError(f"❌  Couldn’t open RTMP stream at {RTMP_URL}")
 
@@ -3,6 +3,7 @@ Mavic 3 Click‑to‑Zoom RTMP Viewer (Touch‑Friendly + Zoom Buttons)
 """
 
 import cv2, numpy as np, time, math
+from video_source import open_capture
 
 # ─ Config ─
 RTMP_URL = "rtmp://127.0.0.1:1935/live/mavic3"
@@ -12,7 +13,7 @@ ZOOM_W, ZOOM_H = 480, 270
 ALT_FT, FOV_DEG = 300, 5
 # ──────────
 
-cap = cv2.VideoCapture(RTMP_URL, cv2.CAP_FFMPEG)
+cap = open_capture(RTMP_URL)
 if not cap.isOpened(): raise RuntimeError("RTMP stream offline")
 
 cv2.namedWindow("Live", cv2.WINDOW_NORMAL)
@@ -1,8 +1,22 @@
 """
 Mavic 3 Click‑to‑Zoom RTMP Viewer  –  XL Touch Buttons
+Several zoom panes can watch different spots of the one decoded stream:
+  left click   move the active pane        middle click / 'n'  add a pane there
+  1‑9          make that pane active       'x'  close the active pane
+  B S N H U V / − +  act on the active pane  G  grid on the live view
+  V  stabilise the pane (from STAB_MIN_Z×): the crop follows the smoothed
+     camera path, so hand‑held / wind jitter is not magnified with the zoom
 """
 
-import cv2, numpy as np, time, math
+import cv2, numpy as np, time, math, os
+from concurrent.futures import ThreadPoolExecutor
+from video_source import open_capture
+from strip_executor import StripExecutor
+from dehaze import Dehazer
+from viewport import Viewport
+from hud import HudLayer, GlyphCache
+from superres import RoiUpscaler
+from motion import Stabilizer
 
 # ─── Config ────────────────────────────────────────────────────────
 RTMP_URL              = "rtmp://127.0.0.1:1935/live/mavic3"
@@ -10,84 +24,170 @@ MIN_Z, MAX_Z          = 5, 50
 INITIAL_Z             = 5
 LIVE_W, LIVE_H        = 960, 540
 ZOOM_W, ZOOM_H        = 480, 270
+MAX_PANES             = 6
+SR_ENGINE             = "edge"       # 'U' upscaler: "edge" (no model) or "dnn" (SR_MODEL)
+SR_MODEL              = "espcn_x4.onnx"
+STAB_MIN_Z            = 10           # 'V' stabilisation acts from this zoom level
+STAB_SMOOTH           = 0.1          # trajectory EMA per frame (lower = steadier, laggier pans)
 ALT_FT, FOV_DEG       = 300, 5
 
-# Button geometry
+# Button geometry (source‑frame px, scaled by LIVE_W / frame width on screen)
 BTN_W, BTN_H          = 160, 100     # ← 4× the old 40×25
 BTN_SP                = 10           # spacing between buttons
 BTN_Y1, BTN_Y2        = 10, 10 + BTN_H
 # ───────────────────────────────────────────────────────────────────
 
-# ── Fast single‑scale dark‑channel de‑haze ─────────────────────────
-def quick_dehaze(img, w=15, t0=0.1):
-    min_ch = cv2.erode(np.min(img, 2), np.ones((w, w), np.uint8))
-    A      = np.percentile(img, 99)
-    t      = 1 - 0.95 * (min_ch.astype(np.float32) / A)
-    t      = cv2.blur(np.clip(t, t0, 1), (w, w))
-    res    = ((img.astype(np.float32) - A) / t[..., None] + A).clip(0, 255)
-    return res.astype(np.uint8)
-# ───────────────────────────────────────────────────────────────────
-
-cap = cv2.VideoCapture(RTMP_URL, cv2.CAP_FFMPEG)
+cap = open_capture(RTMP_URL)
 if not cap.isOpened():
     raise RuntimeError("RTMP stream offline")
 
 cv2.namedWindow("Live", cv2.WINDOW_NORMAL)
-cv2.namedWindow("Zoom", cv2.WINDOW_NORMAL)
 cv2.resizeWindow("Live", LIVE_W, LIVE_H)
-cv2.resizeWindow("Zoom", ZOOM_W, ZOOM_H)
 cv2.setWindowProperty("Live", cv2.WND_PROP_TOPMOST, 1)
 
-# Enhancement switches
-enh = dict(bright=False, sharp=False, night=False, grid=False, dehaze=False)
+# All panes are rendered at their on‑screen size (see viewport.py)
+live_view = Viewport("Live", (LIVE_W, LIVE_H))
+
+usm    = np.array([[-1,-1,-1], [-1,9,-1], [-1,-1,-1]], np.float32)
+CPUS   = os.cpu_count() or 1
+strips = StripExecutor(CPUS) # local filters on overlapping strips, CPUS // panes per ROI
+pool   = ThreadPoolExecutor(MAX_PANES)   # one ROI per task (OpenCV drops the GIL)
+grid   = False
+stab   = Stabilizer(STAB_SMOOTH)   # global shift on a ~480 px pyramid level, shared by all panes
+
+def make_upscaler():
+    try:
+        return RoiUpscaler(SR_ENGINE, SR_MODEL)
+    except Exception as exc:
+        print("⚠️  SR model unavailable, using the edge upscaler:", exc)
+        return RoiUpscaler("edge")
+
+# ── Zoom panes ────────────────────────────────────────────────────
+class ZoomPane:
+    """One zoom window: its own centre, zoom level, toggles and filter state."""
+
+    def __init__(self, n, zx, zy):
+        self.win    = f"Zoom {n}"
+        self.z_lvl, self.zx, self.zy = INITIAL_Z, zx, zy
+        self.enh    = dict(bright=False, sharp=False, night=False, dehaze=False, superres=False, stab=True)
+        self.view   = Viewport(self.win, (ZOOM_W, ZOOM_H))
+        self.clahe  = cv2.createCLAHE(2.5, (8, 8))
+        self.dehaze = Dehazer()     # dark‑channel de‑haze, A / t cached across frames
+        self.sr     = None          # ROI super‑resolution, built on first use
+        self.box    = (0, 0, 0, 0)
+        cv2.namedWindow(self.win, cv2.WINDOW_NORMAL)
+        cv2.resizeWindow(self.win, ZOOM_W, ZOOM_H)
 
-clahe = cv2.createCLAHE(2.5, (8, 8))
-usm   = np.array([[-1,-1,-1], [-1,9,-1], [-1,-1,-1]], np.float32)
+    def close(self):
+        cv2.destroyWindow(self.win)
 
-# ── Build button list with new large sizes ────────────────────────
+    def process(self, frame, size, shake=(0, 0), parts=1):
+        """Crop, enhance and size this pane's ROI (runs on the worker pool).
+        `size` is the pane size, polled on the main thread (HighGUI is not
+        thread‑safe); `shake` is the stabiliser's jitter offset, it moves the
+        crop origin; `parts` = strips per local filter (panes × parts ≈ cores)."""
+        frame_h, frame_w = frame.shape[:2]
+        zw, zh = frame_w // self.z_lvl, frame_h // self.z_lvl
+        ox, oy = shake if self.enh["stab"] and self.z_lvl >= STAB_MIN_Z else (0, 0)
+        x1 = int(np.clip(self.zx - zw//2 + ox, 0, frame_w - zw))
+        y1 = int(np.clip(self.zy - zh//2 + oy, 0, frame_h - zh))
+        self.box = (x1, y1, zw, zh)
+        roi = frame[y1:y1+zh, x1:x1+zw]
+
+        # Work at the pane's size: shrink first when the ROI is larger,
+        # otherwise enhance at source res and upscale once at the end
+        pane = self.view.update(zw, zh, size)
+        if zw > pane[0]:
+            roi = self.view.render(roi, cv2.INTER_AREA, pane)
+
+        # Enhancements
+        enh = self.enh
+        if enh["dehaze"]:
+            roi = self.dehaze(roi)
+        if enh["bright"]:
+            yuv = cv2.cvtColor(roi, cv2.COLOR_BGR2YUV)
+            yuv[:,:,0] = self.clahe.apply(yuv[:,:,0])
+            roi = cv2.cvtColor(yuv, cv2.COLOR_YUV2BGR)
+        if enh["sharp"]:
+            roi = strips.apply(lambda i, s: cv2.filter2D(s, -1, usm), roi, halo=1, parts=parts)
+        if enh["night"]:
+            roi = strips.apply(lambda i, s: cv2.applyColorMap(s, cv2.COLORMAP_SUMMER), roi, halo=0,
+                               parts=parts)
+        if roi.shape[1] != pane[0]:
+            if enh["superres"] and pane[0] >= 2 * roi.shape[1]:
+                self.sr = self.sr or make_upscaler()
+                roi = self.sr(roi, pane)        # reused while the ROI is unchanged
+            else:
+                roi = self.view.render(roi, size=pane)
+        return roi
+
+# ── Button list, laid out in display px once the frame size is known ─
 labels_colors_actions = [
     ("B", (255,128,  0), "bright"),
     ("S", (  0,  0,255), "sharp"),
     ("N", (  0,255,  0), "night"),
     ("G", (  0,255,255), "grid"),
-    ("H", (  0,128,255), "dehaze")
+    ("H", (  0,128,255), "dehaze"),
+    ("U", (255,  0,255), "superres"),
+    ("V", (255,255,  0), "stab")
 ]
 
-btns = []
-x_cursor = 10
-for lab, col, act in labels_colors_actions:
-    btns.append((x_cursor, BTN_Y1,
-                 x_cursor + BTN_W, BTN_Y2,
-                 col, lab, act))
-    x_cursor += BTN_W + BTN_SP
-
-# Zoom buttons (right‑aligned)
-x2_plus = LIVE_W - 10
-x1_plus = x2_plus - BTN_W
-x2_minus = x1_plus - BTN_SP
-x1_minus = x2_minus - BTN_W
-btns += [
-    (x1_minus, BTN_Y1, x2_minus, BTN_Y2, (255,255,255), "−", "z_out"),
-    (x1_plus,  BTN_Y1, x2_plus,  BTN_Y2, (255,255,255), "+", "z_in")
-]
+def layout_buttons(ui, pane_w):
+    """Button rects in display px; `ui` = display px per source px."""
+    bw, bh, sp = round(BTN_W * ui), round(BTN_H * ui), round(BTN_SP * ui)
+    y1, y2 = round(BTN_Y1 * ui), round(BTN_Y1 * ui) + bh
+    btns = []
+    x_cursor = sp
+    for lab, col, act in labels_colors_actions:
+        btns.append((x_cursor, y1, x_cursor + bw, y2, col, lab, act))
+        x_cursor += bw + sp
+
+    # Zoom buttons (right‑aligned)
+    x2_plus = pane_w - sp
+    x1_plus = x2_plus - bw
+    x2_minus = x1_plus - sp
+    x1_minus = x2_minus - bw
+    btns += [
+        (x1_minus, y1, x2_minus, y2, (255,255,255), "−", "z_out"),
+        (x1_plus,  y1, x2_plus,  y2, (255,255,255), "+", "z_in")
+    ]
+    return btns
 
 # ── State ──────────────────────────────────────────────────────────
-z_lvl, zx, zy = INITIAL_Z, 0, 0
+panes, active = [], 0
 fps_buf, prev_t = [30.0]*30, time.time()
 
-# ── Mouse / tap handler ───────────────────────────────────────────
+def add_pane(zx, zy):
+    global active
+    if len(panes) < MAX_PANES:
+        used = {p.win for p in panes}
+        n = next(i for i in range(1, MAX_PANES + 1) if f"Zoom {i}" not in used)
+        panes.append(ZoomPane(n, zx, zy))
+        active = len(panes) - 1
+
+def close_pane():
+    global active
+    if len(panes) > 1:
+        panes.pop(active).close()
+        active = min(active, len(panes) - 1)
+
+# ── Mouse / tap handler (x, y arrive in display px) ───────────────
 def on_mouse(evt, x, y, flags, _):
-    global zx, zy, z_lvl
+    global grid
+    pane = panes[active]
     if evt == cv2.EVENT_LBUTTONDOWN:
         for x1,y1,x2,y2,col,lab,act in btns:
             if x1 <= x <= x2 and y1 <= y <= y2:
-                if   act == "z_in":  z_lvl = min(z_lvl + 1, MAX_Z)
-                elif act == "z_out": z_lvl = max(z_lvl - 1, MIN_Z)
-                elif act in enh:     enh[act] ^= True
+                if   act == "z_in":   pane.z_lvl = min(pane.z_lvl + 1, MAX_Z)
+                elif act == "z_out":  pane.z_lvl = max(pane.z_lvl - 1, MIN_Z)
+                elif act == "grid":   grid ^= True
+                elif act in pane.enh: pane.enh[act] ^= True
                 return
-        zx, zy = x, y
+        pane.zx, pane.zy = live_view.to_src(x, y)
+    elif evt == cv2.EVENT_MBUTTONDOWN:
+        add_pane(*live_view.to_src(x, y))
     elif evt == cv2.EVENT_RBUTTONDOWN:
-        zx, zy = frame_w // 2, frame_h // 2
+        pane.zx, pane.zy = frame_w // 2, frame_h // 2
 
 cv2.setMouseCallback("Live", on_mouse)
 
@@ -95,7 +195,30 @@ cv2.setMouseCallback("Live", on_mouse)
 ok, frame = cap.read()
 if not ok: raise RuntimeError("Stream opened but no frames received")
 frame_h, frame_w = frame.shape[:2]
-zx, zy = frame_w // 2, frame_h // 2
+add_pane(frame_w // 2, frame_h // 2)
+live_view.update(frame_w, frame_h)
+ui   = LIVE_W / frame_w             # overlay sizes keep their on‑screen look
+btns = layout_buttons(ui, LIVE_W)
+
+# Static overlay (buttons, telemetry bar) cached as a sprite, re‑rendered only
+# when a toggle, the active pane or the pane size changes; text from glyph caches
+hud    = HudLayer()
+glyphs = GlyphCache(cv2.FONT_HERSHEY_PLAIN, max(0.8, 1.6*ui), 1)
+tags   = GlyphCache(cv2.FONT_HERSHEY_PLAIN, 1.0, 1)
+bar_h  = max(12, round(30*ui))
+
+def render_hud(c):
+    lw, lh = live_view.size
+    enh = dict(panes[active].enh, grid=grid)
+    for x1b,y1b,x2b,y2b,col,lab,act in btns:
+        fill = col if (act in enh and enh[act]) else (80,80,80) if act in enh else col
+        c.rect((x1b,y1b), (x2b,y2b), fill, -1)
+        c.rect((x1b,y1b), (x2b,y2b), (0,0,0), max(1, round(2*ui)))   # border
+        txt_size = cv2.getTextSize(lab, cv2.FONT_HERSHEY_SIMPLEX, 2.5*ui, max(1, round(4*ui)))[0]
+        txt_x = x1b + (x2b - x1b - txt_size[0]) // 2
+        txt_y = y1b + (y2b - y1b + txt_size[1]) // 2
+        c.text(lab, (txt_x, txt_y), cv2.FONT_HERSHEY_SIMPLEX, 2.5*ui, (0,0,0), max(1, round(4*ui)))
+    c.rect((0,lh-bar_h), (lw,lh), (0,0,0), -1)
 
 # ── Main loop ─────────────────────────────────────────────────────
 while True:
@@ -103,55 +226,55 @@ while True:
     if not ok: break
     frame_h, frame_w = frame.shape[:2]
 
-    zw, zh = frame_w // z_lvl, frame_h // z_lvl
-    x1 = int(np.clip(zx - zw//2, 0, frame_w - zw))
-    y1 = int(np.clip(zy - zh//2, 0, frame_h - zh))
-    roi = frame[y1:y1+zh, x1:x1+zw]
-
-    # Enhancements
-    if enh["dehaze"]:
-        roi = quick_dehaze(roi)
-    if enh["bright"]:
-        yuv = cv2.cvtColor(roi, cv2.COLOR_BGR2YUV)
-        yuv[:,:,0] = clahe.apply(yuv[:,:,0])
-        roi = cv2.cvtColor(yuv, cv2.COLOR_YUV2BGR)
-    if enh["sharp"]:
-        roi = cv2.filter2D(roi, -1, usm)
-    if enh["night"]:
-        roi = cv2.applyColorMap(roi, cv2.COLORMAP_SUMMER)
-    roi = cv2.resize(roi, (zw*z_lvl, zh*z_lvl))
-
-    # Overlays
-    live = frame.copy()
-    cv2.rectangle(live, (x1,y1), (x1+zw,y1+zh), (0,255,0), 2)
-    if enh["grid"]:
-        for n in (1,2):
-            cv2.line(live, (0, frame_h*n//3), (frame_w, frame_h*n//3), (255,255,255), 1)
-            cv2.line(live, (frame_w*n//3, 0), (frame_w*n//3, frame_h), (255,255,255), 1)
+    # Camera jitter, estimated once per frame while some pane needs it
+    if any(p.enh["stab"] and p.z_lvl >= STAB_MIN_Z for p in panes):
+        shake = stab.update(frame)
+    else:
+        shake = (0, 0)
+        stab.reset()
 
-    # Draw buttons
-    for x1b,y1b,x2b,y2b,col,lab,act in btns:
-        fill = col if (act in enh and enh[act]) else (80,80,80) if act in enh else col
-        cv2.rectangle(live, (x1b,y1b), (x2b,y2b), fill, -1)
-        cv2.rectangle(live, (x1b,y1b), (x2b,y2b), (0,0,0), 2)   # border
-        txt_size = cv2.getTextSize(lab, cv2.FONT_HERSHEY_SIMPLEX, 2.5, 4)[0]
-        txt_x = x1b + (BTN_W - txt_size[0]) // 2
-        txt_y = y1b + (BTN_H + txt_size[1]) // 2
-        cv2.putText(live, lab, (txt_x, txt_y),
-                    cv2.FONT_HERSHEY_SIMPLEX, 2.5, (0,0,0), 4, cv2.LINE_AA)
+    # Every pane's ROI from this one frame, enhanced in parallel; the live
+    # view is rendered meanwhile on this thread (pane sizes are read here too);
+    # the cores are shared out so panes × strips stays about one thread per core
+    parts = max(1, CPUS // len(panes))
+    jobs  = [pool.submit(p.process, frame, p.view.poll(), shake, parts) for p in panes]
+
+    # Overlays, drawn in display px on the pane‑sized copy of the frame
+    live = live_view.render(frame)
+    lw, lh = live_view.size
+    if btns[-1][2] != lw - round(BTN_SP * ui):          # window was resized
+        btns = layout_buttons(ui, lw)
+    rois = [j.result() for j in jobs]
+    for i, p in enumerate(panes):
+        x1, y1, zw, zh = p.box
+        col = (0,255,0) if i == active else (0,160,255)
+        cv2.rectangle(live, live_view.to_disp(x1, y1), live_view.to_disp(x1+zw, y1+zh), col, 2)
+        tx, ty = live_view.to_disp(x1, y1)
+        tags.draw(live, p.win[5:], (tx + 4, ty + 14), col)
+    if grid:            # full‑pane lines: cheaper drawn than blended
+        for n in (1,2):
+            cv2.line(live, (0, lh*n//3), (lw, lh*n//3), (255,255,255), 1)
+            cv2.line(live, (lw*n//3, 0), (lw*n//3, lh), (255,255,255), 1)
+    hud.update((lw, lh), (active, tuple(panes[active].enh.values()), grid), render_hud)
+    hud.composite(live)
 
     # Telemetry
     now = time.time(); fps = 1/(now - prev_t); prev_t = now
     fps_buf.append(fps); fps_buf = fps_buf[-30:]
     gsd_cm = 2*ALT_FT*0.3048*math.tan(math.radians(FOV_DEG/2))/frame_w*100
-    bar = f"{time.strftime('%H:%M:%S')} | Z{z_lvl}× | GSD {gsd_cm:.1f} cm/px | FPS {sum(fps_buf)/len(fps_buf):.1f}"
-    cv2.rectangle(live, (0,frame_h-30), (frame_w,frame_h), (0,0,0), -1)
-    cv2.putText(live, bar, (10, frame_h-7),
-                cv2.FONT_HERSHEY_PLAIN, 1.6, (0,255,255), 2, cv2.LINE_AA)
+    bar = f"{time.strftime('%H:%M:%S')} | {panes[active].win} Z{panes[active].z_lvl}× | GSD {gsd_cm:.1f} cm/px | FPS {sum(fps_buf)/len(fps_buf):.1f}"
+    glyphs.draw(live, bar, (round(10*ui), lh-round(7*ui)), (0,255,255))
 
     cv2.imshow("Live", live)
-    cv2.imshow("Zoom", roi)
-    if cv2.waitKey(1) & 0xFF == 27: break   # ESC
+    for p, roi in zip(panes, rois):
+        cv2.imshow(p.win, roi)
+    key = cv2.waitKey(1) & 0xFF
+    if key == 27: break                     # ESC
+    if key == ord('n'): add_pane(frame_w // 2, frame_h // 2)
+    if key == ord('x'): close_pane()
+    if ord('1') <= key <= ord('9'):         # by window number, not list position
+        active = next((i for i, p in enumerate(panes) if p.win == f"Zoom {key - ord('0')}"), active)
 
+pool.shutdown()
 cap.release()
 cv2.destroyAllWindows()
@@ -1,17 +1,22 @@
 
 
 import cv2
-import numpy as np
 import time
+from video_source import open_capture
+from enhance_chain import NightVisionChain
+from tonemap import ReinhardTonemap
 
 # ── Runtime configuration ──────────────────────────────────────────
 RTMP_URL      = "rtmp://127.0.0.1:1935/live/mavic3"   # ← your stream URL
 LIVE_WIN_W    = 960     # width of the display window (px)
 LIVE_WIN_H    = 540     # height of the display window (px)
+DENOISE       = "auto"  # bilateral / bilateral_half / bilateral_quarter / guided / temporal / auto
+FRAME_BUDGET_MS = 33    # "auto" picks the best denoise tier that fits this per frame
+STRIP_WORKERS = 0       # strip‑parallel filtering: 0 = one strip per CPU core, 1 = off
 # ───────────────────────────────────────────────────────────────────
 
 # Open the RTMP stream (FFmpeg must be available to OpenCV)
-cap = cv2.VideoCapture(RTMP_URL, cv2.CAP_FFMPEG)
+cap = open_capture(RTMP_URL)
 if not cap.isOpened():
     raise RuntimeError(f"❌  Couldn’t open RTMP stream at {RTMP_URL}")
 
@@ -19,45 +24,20 @@ if not cap.isOpened():
 cv2.namedWindow("Enhanced Drone Footage", cv2.WINDOW_NORMAL)
 cv2.resizeWindow("Enhanced Drone Footage", LIVE_WIN_W, LIVE_WIN_H)   # ← NEW
 
-# ── Your original enhancement function (verbatim) ─────────────────
+# ── Enhancement ────────────────────────────────────────────────────
+tonemap = ReinhardTonemap(gamma=1, intensity=0.5, light_adapt=0.5)   # stats on a subsampled plane
+night_chain = NightVisionChain(clip_limit=2.0, tile_grid=(8, 8),
+                               denoise=DENOISE, budget_ms=FRAME_BUDGET_MS,
+                               workers=STRIP_WORKERS)   # built once
+
 def enhance_drone_footage(frame, brightness, contrast):
-    # Apply Reinhard's tone mapping for dynamic range compression
-    frame_float = frame.astype(np.float32) / 255.0
-    tone_map = cv2.createTonemapReinhard(gamma=1,
-                                         intensity=0.5,
-                                         light_adapt=0.5,
-                                         color_adapt=0)
-    frame_tone_mapped = tone_map.process(frame_float)
-    frame = (frame_tone_mapped * 255).astype(np.uint8)
-
-    # Convert the frame to grayscale
-    gray_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-
-    # Apply CLAHE for local contrast enhancement
-    clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
-    enhanced_frame = clahe.apply(gray_frame)
-
-    # Apply Gaussian blur for noise reduction
-    enhanced_frame = cv2.GaussianBlur(enhanced_frame, (5, 5), 0)
-
-    # Apply a bilateral filter for further noise reduction while keeping the edges sharp
-    enhanced_frame = cv2.bilateralFilter(enhanced_frame, 9, 75, 75)
-
-    # Convert the enhanced grayscale frame back to BGR color space
-    enhanced_frame = cv2.cvtColor(enhanced_frame, cv2.COLOR_GRAY2BGR)
-
-    # Apply sharpening filter
-    kernel = np.array([[-1, -1, -1],
-                       [-1,  9, -1],
-                       [-1, -1, -1]])
-    enhanced_frame = cv2.filter2D(enhanced_frame, -1, kernel)
-
-    # Adjust brightness and contrast
-    enhanced_frame = cv2.addWeighted(enhanced_frame, contrast,
-                                     np.zeros_like(enhanced_frame), 0,
-                                     brightness * 255)
-
-    return enhanced_frame
+    # Reinhard tone mapping for dynamic range compression (uint8 in, uint8 out;
+    # matches cv2.createTonemapReinhard to within a couple of grey levels)
+    frame = tonemap(frame)
+
+    # gray → CLAHE → Gaussian → bilateral → sharpen → brightness/contrast LUT
+    # (the LUT is rebuilt only when a track‑bar value changes)
+    return night_chain.process(frame, brightness, contrast)
 # ───────────────────────────────────────────────────────────────────
 
 # Track‑bar callbacks & globals
@@ -4,17 +4,21 @@ DJI Mavic 3 Pro — enhanced‑vision RTMP viewer
 """
 
 import cv2
-import numpy as np
 import time
+from video_source import open_capture
+from enhance_chain import NightVisionChain
 
 # ── Runtime configuration ──────────────────────────────────────────
 RTMP_URL      = "rtmp://127.0.0.1:1935/live/mavic3"   # ← update if your stream key changes
 LIVE_WIN_W    = 960     # initial width of the display window (px)
 LIVE_WIN_H    = 540     # initial height of the display window (px)
+DENOISE       = "auto"  # bilateral / bilateral_half / bilateral_quarter / guided / temporal / auto
+FRAME_BUDGET_MS = 33    # "auto" picks the best denoise tier that fits this per frame
+STRIP_WORKERS = 0       # strip‑parallel filtering: 0 = one strip per CPU core, 1 = off
 # ───────────────────────────────────────────────────────────────────
 
 # Open the RTMP stream (requires FFmpeg inside OpenCV wheels)
-cap = cv2.VideoCapture(RTMP_URL, cv2.CAP_FFMPEG)
+cap = open_capture(RTMP_URL)
 if not cap.isOpened():
     raise RuntimeError(f"❌  Couldn’t open RTMP stream at {RTMP_URL}")
 
@@ -22,36 +26,15 @@ if not cap.isOpened():
 cv2.namedWindow("Enhanced Drone Footage", cv2.WINDOW_NORMAL)
 cv2.resizeWindow("Enhanced Drone Footage", LIVE_WIN_W, LIVE_WIN_H)  # ← NEW
 
-# ── Original enhancement function (verbatim) ───────────────────────
-def enhance_drone_footage(frame, brightness, contrast):
-    # Convert the frame to grayscale
-    gray_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-
-    # Apply CLAHE for local contrast enhancement
-    clahe = cv2.createCLAHE(clipLimit=6.0, tileGridSize=(1, 1))
-    enhanced_frame = clahe.apply(gray_frame)
-
-    # Apply Gaussian blur for noise reduction
-    enhanced_frame = cv2.GaussianBlur(enhanced_frame, (5, 5), 0)
-
-    # Apply a bilateral filter for further noise reduction while keeping the edges sharp
-    enhanced_frame = cv2.bilateralFilter(enhanced_frame, 9, 75, 75)
+# ── Enhancement chain (built once, see enhance_chain.py) ───────────
+night_chain = NightVisionChain(clip_limit=6.0, tile_grid=(1, 1),
+                               denoise=DENOISE, budget_ms=FRAME_BUDGET_MS,
+                               workers=STRIP_WORKERS)
 
-    # Convert the enhanced grayscale frame back to BGR color space
-    enhanced_frame = cv2.cvtColor(enhanced_frame, cv2.COLOR_GRAY2BGR)
-
-    # Apply sharpening filter
-    kernel = np.array([[-1, -1, -1],
-                       [-1,  9, -1],
-                       [-1, -1, -1]])
-    enhanced_frame = cv2.filter2D(enhanced_frame, -1, kernel)
-
-    # Adjust brightness and contrast
-    enhanced_frame = cv2.addWeighted(enhanced_frame, contrast,
-                                     np.zeros_like(enhanced_frame), 0,
-                                     brightness * 255)
-
-    return enhanced_frame
+def enhance_drone_footage(frame, brightness, contrast):
+    # gray → CLAHE → Gaussian → bilateral → sharpen → brightness/contrast LUT
+    # (rebuilt only when a track‑bar moves); imshow shows the 1‑channel result
+    return night_chain.process(frame, brightness, contrast)
 
 # ── Track‑bar callbacks & globals ──────────────────────────────────
 brightness = 0.0
@@ -1,16 +1,26 @@
 
 import cv2
-import numpy as np
 import time
+from video_source import open_capture
+from enhance_chain import NightVisionChain
+from zero_dce import ZeroDCE
+from stacking import FrameStacker
 
 # ── Runtime configuration ──────────────────────────────────────────
 RTMP_URL      = "rtmp://127.0.0.1:1935/live/mavic3"   # ← update if your stream key changes
 LIVE_WIN_W    = 960     # initial width of the display window (px)
 LIVE_WIN_H    = 540     # initial height of the display window (px)
+DENOISE       = "auto"  # bilateral / bilateral_half / bilateral_quarter / guided / temporal / auto
+FRAME_BUDGET_MS = 33    # "auto" picks the best denoise tier that fits this per frame
+STRIP_WORKERS = 0       # strip‑parallel filtering: 0 = one strip per CPU core, 1 = off
+NIGHT_MODE    = "clahe" # "clahe" (hand‑tuned chain) or "zerodce" (learned curves) — 'z' toggles
+ZERO_DCE_PATH = "zerodce.onnx"
+STACKING      = False   # average the last STACK_FRAMES aligned frames first — 's' toggles
+STACK_FRAMES  = 6
 # ───────────────────────────────────────────────────────────────────
 
 # Open the RTMP stream (requires FFmpeg inside OpenCV wheels)
-cap = cv2.VideoCapture(RTMP_URL, cv2.CAP_FFMPEG)
+cap = open_capture(RTMP_URL)
 if not cap.isOpened():
     raise RuntimeError(f"❌  Couldn't open RTMP stream at {RTMP_URL}")
 
@@ -18,36 +28,35 @@ if not cap.isOpened():
 cv2.namedWindow("Enhanced Drone Footage", cv2.WINDOW_NORMAL)
 cv2.resizeWindow("Enhanced Drone Footage", LIVE_WIN_W, LIVE_WIN_H)  # ← NEW
 
-# ── Original enhancement function (verbatim) ───────────────────────
-def enhance_drone_footage(frame, brightness, contrast):
-    # Convert the frame to grayscale
-    gray_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-
-    # Apply CLAHE for local contrast enhancement
-    clahe = cv2.createCLAHE(clipLimit=6.0, tileGridSize=(1, 1))
-    enhanced_frame = clahe.apply(gray_frame)
-
-    # Apply Gaussian blur for noise reduction
-    enhanced_frame = cv2.GaussianBlur(enhanced_frame, (5, 5), 0)
-
-    # Apply a bilateral filter for further noise reduction while keeping the edges sharp
-    enhanced_frame = cv2.bilateralFilter(enhanced_frame, 9, 75, 75)
+# ── Enhancement chain (built once, see enhance_chain.py) ───────────
+night_chain = NightVisionChain(clip_limit=6.0, tile_grid=(1, 1),
+                               denoise=DENOISE, budget_ms=FRAME_BUDGET_MS,
+                               workers=STRIP_WORKERS)
 
-    # Convert the enhanced grayscale frame back to BGR color space
-    enhanced_frame = cv2.cvtColor(enhanced_frame, cv2.COLOR_GRAY2BGR)
+zero_dce   = None       # loaded on first use of the learned mode
+night_mode = NIGHT_MODE
+stacker    = FrameStacker(k=STACK_FRAMES)   # phase‑correlation aligned running sum
+stacking   = STACKING
 
-    # Apply sharpening filter
-    kernel = np.array([[-1, -1, -1],
-                       [-1,  9, -1],
-                       [-1, -1, -1]])
-    enhanced_frame = cv2.filter2D(enhanced_frame, -1, kernel)
-
-    # Adjust brightness and contrast
-    enhanced_frame = cv2.addWeighted(enhanced_frame, contrast,
-                                     np.zeros_like(enhanced_frame), 0,
-                                     brightness * 255)
-
-    return enhanced_frame
+def enhance_drone_footage(frame, brightness, contrast):
+    global zero_dce, night_mode
+    if stacking:
+        frame = stacker.push(frame)     # ≈ √K less noise before any amplification
+    if night_mode == "zerodce" and zero_dce is None:
+        try:
+            zero_dce = ZeroDCE(ZERO_DCE_PATH)
+        except Exception as exc:
+            print("⚠️  Zero‑DCE unavailable, staying on CLAHE:", exc)
+            night_mode = "clahe"
+    if night_mode == "zerodce":
+        # Zero‑DCE curves inferred on a tiny frame, applied as a full‑res gain map,
+        # then the same brightness/contrast LUT as the CLAHE chain
+        night_chain.set_levels(brightness, contrast)
+        return cv2.LUT(zero_dce.enhance(frame), night_chain.lut)
+
+    # gray → CLAHE → Gaussian → bilateral → sharpen → brightness/contrast LUT
+    # (rebuilt only when a track‑bar moves); imshow shows the 1‑channel result
+    return night_chain.process(frame, brightness, contrast)
 
 # ── Track‑bar callbacks & globals ──────────────────────────────────
 brightness = 0.0
@@ -83,9 +92,15 @@ while True:
     time.sleep(delay)
     prev_frame_time = curr_frame_time
 
-    # Quit on 'q'
-    if cv2.waitKey(1) & 0xFF == ord('q'):
+    # Quit on 'q', toggle CLAHE / Zero‑DCE on 'z', stacking on 's'
+    key = cv2.waitKey(1) & 0xFF
+    if key == ord('q'):
         break
+    if key == ord('z'):
+        night_mode = "clahe" if night_mode == "zerodce" else "zerodce"
+    if key == ord('s'):
+        stacking = not stacking
+        stacker.reset()
 
 # Cleanup
 cap.release()
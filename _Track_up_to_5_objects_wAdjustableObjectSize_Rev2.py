@@ -5,15 +5,17 @@ DJI Mavic 3 Pro — motion‑detection RTMP viewer
 
 import cv2
 import numpy as np
+from video_source import open_capture
 
 # ── Runtime configuration ──────────────────────────────────────────
 RTMP_URL      = "rtmp://127.0.0.1:1935/live/mavic3"   # ← update if needed
 LIVE_WIN_W    = 960     # initial width of the display window (px)
 LIVE_WIN_H    = 540     # initial height of the display window (px)
+PROC_SIZE     = (2880, 900)   # frames arrive pre‑scaled for faster processing
 # ───────────────────────────────────────────────────────────────────
 
 # Open the RTMP stream
-cap = cv2.VideoCapture(RTMP_URL, cv2.CAP_FFMPEG)
+cap = open_capture(RTMP_URL, size=PROC_SIZE)
 if not cap.isOpened():
     raise RuntimeError(f"❌  Couldn’t open RTMP stream at {RTMP_URL}")
 
@@ -38,9 +40,6 @@ while True:
         print("⚠️  Stream ended or cannot read frame.")
         break
 
-    # Resize for faster processing (optional—comment out if you prefer native res)
-    frame = cv2.resize(frame, (2880, 900))
-
     # Convert to grayscale + blur
     gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
     gray = cv2.GaussianBlur(gray, (21, 21), 0)
@@ -5,17 +5,19 @@ DJI Mavic 3 Pro — motion‑detection RTMP viewer
 
 import cv2
 import numpy as np
+from video_source import open_capture
 
 # ── Runtime configuration ──────────────────────────────────────────
 RTMP_URL      = "rtmp://127.0.0.1:1935/live/mavic3"   # ← your stream URL
 LIVE_WIN_W    = 960     # initial width of display window (px)
 LIVE_WIN_H    = 540     # initial height of display window (px)
+PROC_SIZE     = (2880, 900)   # frames arrive pre‑scaled for faster processing
 # ───────────────────────────────────────────────────────────────────
 MIN_X_SIDE = 30
 PERSISTENCE_FRAMES = 15
 
 # Open the RTMP stream (needs FFmpeg inside OpenCV)
-cap = cv2.VideoCapture(RTMP_URL, cv2.CAP_FFMPEG)
+cap = open_capture(RTMP_URL, size=PROC_SIZE)
 if not cap.isOpened():
     raise RuntimeError(f"❌  Couldn’t open RTMP stream at {RTMP_URL}")
 
@@ -35,9 +37,6 @@ while True:
         print("⚠️  Stream ended or cannot read frame.")
         break
 
-    # Resize for faster processing (comment out if you prefer native res)
-    frame = cv2.resize(frame, (2880, 900))
-
     # Convert to grayscale and blur
     gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
     gray = cv2.GaussianBlur(gray, (21, 21), 0)
@@ -20,6 +20,8 @@ COL_WARN = "#ff4040"
 FONT_HDR = ("Consolas", 18, "bold")
 FONT_BTN = ("Consolas", 14, "bold")
 
+BUS_NAME = "mavic3"    # frame_bus.py shared‑memory name (DRONE_SOURCE=shm://mavic3)
+
 class JetButton(ttk.Button):
     def __init__(self, master, **kw):
         ttk.Button.__init__(self, master, style="Jet.TButton", **kw)
@@ -29,8 +31,9 @@ class App:
         self.master = master
         self.path   = path
         self.script = None
-        self.process = self.pid = None
+        self.processes = []                 # running vision scripts
         self.stream_process = self.stream_pid = None
+        self.bus_process = None
 
         self.build_ui()
         self.display_ip_address()
@@ -67,6 +70,15 @@ class App:
                                          command=self.stop_stream, state="disabled")
         self.stop_stream_btn.grid(row=0, column=3, padx=8)
 
+        # shared decode: one frame_bus.py publisher, many viewers
+        self.start_bus_btn = JetButton(ctrl, text="START FRAME BUS",
+                                       command=self.start_bus)
+        self.start_bus_btn.grid(row=1, column=0, columnspan=2, padx=8, pady=(8, 0))
+
+        self.stop_bus_btn = JetButton(ctrl, text="STOP FRAME BUS",
+                                      command=self.stop_bus, state="disabled")
+        self.stop_bus_btn.grid(row=1, column=2, columnspan=2, padx=8, pady=(8, 0))
+
         # IP read‑out
         self.ip_label = tk.Label(self.master, fg=COL_TXT, bg=COL_BG,
                                  font=("Consolas", 12))
@@ -105,28 +117,55 @@ class App:
         self.launch_btn.state(["!disabled"])
 
     # ── launch / kill --------------------------------------------------------
+    # Without the frame bus every script decodes the stream itself, so only one
+    # runs at a time.  With the bus running, scripts attach to shared memory and
+    # several views can run side by side.
     def launch_script(self):
         if not self.script:
             return
-        if self.process:
+        env = os.environ.copy()
+        if self.bus_process:
+            env["DRONE_SOURCE"] = f"shm://{BUS_NAME}"
+        elif self.processes:
             self.kill_script()
 
-        self.process = subprocess.Popen(
+        self.processes.append(subprocess.Popen(
             ["python", os.path.join(self.path, self.script)],
-            cwd=self.path
-        )
-        self.pid = self.process.pid
-        self.launch_btn.state(["disabled"])
+            cwd=self.path, env=env
+        ))
+        if not self.bus_process:
+            self.launch_btn.state(["disabled"])
         self.kill_btn.state(["!disabled"])
 
     def kill_script(self):
-        if self.pid:
-            try: psutil.Process(self.pid).terminate()
+        for proc in self.processes:
+            try: psutil.Process(proc.pid).terminate()
             except psutil.NoSuchProcess: pass
-        self.process = self.pid = None
+        self.processes = []
         self.launch_btn.state(["!disabled"])
         self.kill_btn.state(["disabled"])
 
+    # ── start / stop frame bus -----------------------------------------------
+    def start_bus(self):
+        if self.bus_process:
+            return
+        self.kill_script()      # running scripts own their own decode
+        self.bus_process = subprocess.Popen(
+            ["python", os.path.join(self.path, "frame_bus.py"), "--name", BUS_NAME],
+            cwd=self.path
+        )
+        self.start_bus_btn.state(["disabled"])
+        self.stop_bus_btn.state(["!disabled"])
+
+    def stop_bus(self):
+        self.kill_script()
+        if self.bus_process:
+            try: psutil.Process(self.bus_process.pid).terminate()
+            except psutil.NoSuchProcess: pass
+        self.bus_process = None
+        self.start_bus_btn.state(["!disabled"])
+        self.stop_bus_btn.state(["disabled"])
+
     # ── start / stop RTMP ----------------------------------------------------
     def start_stream(self):
         if self.stream_process:
@@ -0,0 +1,144 @@
+"""
+Detection off the display thread, boxes carried by optical flow in between
+YOLO on a laptop CPU runs at a few Hz, the stream at 30 fps.  DetectorThread
+runs the detector on a worker thread (cv2.dnn / onnxruntime release the GIL)
+against the newest frame handed to it while idle; FlowTracker moves the last
+detections along with the image every displayed frame:
+
+  · a 4×4 grid of points inside each box is tracked with one pyramidal
+    Lucas–Kanade call for all boxes; each box shifts by its points' median
+  · a detection result belongs to the frame it was computed on, so it is
+    first carried through the frames shown since then, pair by pair (one
+    big jump would lose LK) — boxes line up with the picture even when
+    inference takes several frames
+
+    worker  = DetectorThread(Detector("yolov8n.onnx"))
+    tracker = FlowTracker()
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)   # a new array every frame
+    worker.submit(frame, gray)                    # ignored while busy
+    dets = tracker.update(gray, worker.poll())    # (n, 6) in this frame's px
+"""
+
+import threading, time
+from collections import deque
+import cv2
+import numpy as np
+
+GRID = 4                    # points per box side
+LK_PARAMS = dict(winSize=(21, 21), maxLevel=3,
+                 criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 20, 0.03))
+
+
+class DetectorThread:
+    """Runs `detect(frame) → dets` on a background thread, newest frame only.
+
+    submit() copies the frame only when the worker is idle; poll() returns
+    (tag, dets) once per finished inference, else None — `tag` is whatever
+    was submitted with the frame (FlowTracker wants its gray).  `rate` is
+    the smoothed number of inferences per second.
+    """
+
+    def __init__(self, detect):
+        self.detect = detect
+        self.cond   = threading.Condition()
+        self.job    = self.result = self.error = None
+        self.busy, self.running = False, True
+        self.rate   = 0.0
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def submit(self, frame, tag=None):
+        with self.cond:
+            if self.busy:
+                return False
+            self.job  = (frame.copy(), tag)
+            self.busy = True
+            self.cond.notify()
+        return True
+
+    def poll(self):
+        with self.cond:
+            if self.error is not None:
+                raise RuntimeError("detector thread failed") from self.error
+            res, self.result = self.result, None
+        return res
+
+    def _run(self):
+        while True:
+            with self.cond:
+                while self.job is None and self.running:
+                    self.cond.wait()
+                if not self.running:
+                    return
+                (frame, tag), self.job = self.job, None
+            t0 = time.time()
+            try:
+                dets = self.detect(frame)
+            except Exception as exc:
+                with self.cond:
+                    self.error = exc
+                return
+            dt = max(time.time() - t0, 1e-6)
+            with self.cond:
+                self.rate   = 1 / dt if not self.rate else 0.8 * self.rate + 0.2 / dt
+                self.result = (tag, dets)
+                self.busy   = False
+
+    def stop(self):
+        with self.cond:
+            self.running = False
+            self.cond.notify()
+        self.thread.join()
+
+
+class FlowTracker:
+    """Last detections, moved with the image between inferences.
+
+    Keeps the grays shown since the last result (at most `max_lag`) so the
+    next result can be replayed up to the present; they are matched by
+    identity, so pass a fresh gray array every frame and do not modify it.
+    """
+
+    def __init__(self, max_lag=60):
+        self.history = deque(maxlen=max_lag)
+        self.dets = np.empty((0, 6), np.float32)
+        f = (np.arange(GRID) + 0.5) / GRID * 0.5 + 0.25          # inner half of the box
+        fx, fy = np.meshgrid(f, f)
+        self.frac = np.stack([fx.ravel(), fy.ravel()], 1).astype(np.float32)
+
+    def _carry(self, src, dst, dets):
+        """Shift dets (px of src) by the median flow of their grid points."""
+        if not len(dets):
+            return dets
+        wh  = dets[:, 2:4] - dets[:, :2]
+        pts = (dets[:, None, :2] + self.frac[None] * wh[:, None]).reshape(-1, 1, 2)
+        nxt, st, _ = cv2.calcOpticalFlowPyrLK(src, dst, pts, None, **LK_PARAMS)
+        d  = (nxt - pts).reshape(len(dets), -1, 2)
+        ok = st.reshape(len(dets), -1, 1).astype(bool)
+        with np.errstate(all="ignore"):
+            shift = np.nan_to_num(np.nanmedian(np.where(ok, d, np.nan), axis=1))
+        dets = dets.copy()
+        dets[:, :2] += shift
+        dets[:, 2:4] += shift
+        return dets
+
+    def update(self, gray, result=None):
+        """Advance to `gray`; `result` = (gray, dets) from DetectorThread.poll()."""
+        if result is None:
+            if self.history:
+                self.dets = self._carry(self.history[-1], gray, self.dets)
+            self.history.append(gray)
+            return self.dets
+        src, dets = result
+        self.history.append(gray)
+        path = list(self.history)
+        i = next((k for k, g in enumerate(path) if g is src), None)
+        if i is None:                       # older than the history: one jump
+            path = [src, gray]
+            i = 0
+        for a, b in zip(path[i:], path[i + 1:]):
+            dets = self._carry(a, b, dets)
+        self.dets = dets
+        self.history.clear()                # later results come from later frames
+        self.history.append(gray)
+        return self.dets
@@ -0,0 +1,233 @@
+"""
+Denoise engines for the night‑vision chain, plus a frame‑budget tier picker
+Full‑res cv2.bilateralFilter(…, 9, 75, 75) is the most expensive stage of the
+chain on a 4K frame.  The cheaper tiers trade a little edge fidelity for speed:
+
+    bilateral          full resolution (reference)
+    bilateral_half     bilateral on a ½‑res plane, guided upsampling to full res
+    bilateral_quarter  same on a ¼‑res plane
+    guided             fast self‑guided filter on a ¼‑res plane (box filters only)
+
+plus `temporal`, a motion‑adaptive recursive (IIR) filter that averages over
+time instead of space — cheaper, and steadier on hovering shots, but stateful,
+so it is chosen by name rather than by the tier picker.
+
+Every engine is called as engine(src, dst) on uint8 single‑channel planes and
+declares `halo` (rows of context it needs), `align` (row multiple its strip
+boundaries must sit on) and `split` (False: needs the whole frame at once) for
+strip_executor.StripExecutor.
+TierController picks the best tier whose measured time fits the budget left
+over by the other stages.
+"""
+
+import cv2
+import numpy as np
+
+
+def _box(src, r, dst=None):
+    return cv2.boxFilter(src, -1, (2 * r + 1, 2 * r + 1), dst=dst,
+                         borderType=cv2.BORDER_REFLECT)
+
+
+def guided_coeffs(I, p, r, eps):
+    """He et al. guided filter: smoothed linear coefficients (a, b) of p ≈ a·I + b."""
+    mean_I, mean_p = _box(I, r), _box(p, r)
+    cov_Ip = _box(I * p, r) - mean_I * mean_p
+    var_I  = _box(I * I, r) - mean_I * mean_I
+    a = cov_Ip / (var_I + eps)
+    b = mean_p - a * mean_I
+    return _box(a, r), _box(b, r)
+
+
+class Bilateral:
+    name  = "bilateral"
+    align = 1
+    split = True
+
+    def __init__(self, d=9, sigma_color=75, sigma_space=75):
+        self.d, self.sc, self.ss = d, sigma_color, sigma_space
+        self.halo = d // 2
+
+    def __call__(self, src, dst):
+        return cv2.bilateralFilter(src, self.d, self.sc, self.ss, dst=dst)
+
+
+class _LowRes:
+    """Filter a downscaled plane, then guided‑upsample (fast guided filter):
+    linear coefficients fitted at low res are applied to the full‑res guide.
+
+    The plane is reflect‑padded to whole low‑res pixels first, so every low‑res
+    pixel covers exactly scale × scale source pixels — the same grid whether the
+    frame runs in one piece or as `align`‑ed strips with a ragged last one.
+
+    `filter_low(small) → small` is the low‑res filter (None = the plane itself,
+    i.e. self‑guided smoothing) and `low_radius` its neighbourhood in low‑res
+    pixels."""
+
+    split = True
+
+    def __init__(self, scale, r, eps, filter_low=None, low_radius=0):
+        self.scale, self.r, self.eps = scale, r, eps
+        self.filter_low, self.low_radius = filter_low, low_radius
+        self.shape = None
+
+    @property
+    def align(self):
+        return self.scale
+
+    @property
+    def halo(self):     # area downscale + two box passes + low‑res filter + bilinear tap
+        return self.scale * (2 * self.r + self.low_radius + 2)
+
+    def _alloc(self, shape):
+        h, w = shape
+        self.shape = shape
+        self.pad   = (-h % self.scale, -w % self.scale)
+        padded     = (h + self.pad[0], w + self.pad[1])
+        self.low   = (padded[1] // self.scale, padded[0] // self.scale)
+        self.I     = np.empty(padded, np.float32)
+        self.a_up  = np.empty(padded, np.float32)
+        self.b_up  = np.empty(padded, np.float32)
+
+    def __call__(self, src, dst):
+        if src.shape != self.shape:
+            self._alloc(src.shape)
+        if any(self.pad):
+            src = cv2.copyMakeBorder(src, 0, self.pad[0], 0, self.pad[1], cv2.BORDER_REFLECT)
+        small = cv2.resize(src, self.low, interpolation=cv2.INTER_AREA)
+        I_low = small.astype(np.float32)
+        p_low = I_low if self.filter_low is None else self.filter_low(small).astype(np.float32)
+        a, b  = guided_coeffs(I_low, p_low, self.r, self.eps)
+
+        size = self.I.shape[::-1]
+        cv2.resize(a, size, dst=self.a_up, interpolation=cv2.INTER_LINEAR)
+        cv2.resize(b, size, dst=self.b_up, interpolation=cv2.INTER_LINEAR)
+        np.copyto(self.I, src, casting="unsafe")
+        cv2.multiply(self.a_up, self.I, dst=self.a_up)
+        cv2.add(self.a_up, self.b_up, dst=self.a_up)
+        np.maximum(self.a_up, 0, out=self.a_up)              # so convertScaleAbs just rounds
+        h, w = self.shape
+        return cv2.convertScaleAbs(self.a_up[:h, :w], dst=dst)
+
+
+class LowResBilateral(_LowRes):
+    def __init__(self, scale=2, d=9, sigma_color=75, sigma_space=75, r=2, eps=50.0):
+        d = max(3, (d // scale) | 1)                         # same footprint in full‑res pixels
+        ss = sigma_space / scale
+        super().__init__(scale, r, eps, lambda small: cv2.bilateralFilter(small, d, sigma_color, ss), d // 2)
+        self.name = {2: "bilateral_half", 4: "bilateral_quarter"}.get(scale, f"bilateral_1/{scale}")
+
+
+class FastGuided(_LowRes):
+    """Self‑guided edge‑preserving smoothing; eps ≈ (grey levels)² of noise to flatten."""
+    name = "guided"
+
+    def __init__(self, scale=4, r=2, eps=400.0):
+        super().__init__(scale, r, eps)
+
+
+class Temporal:
+    """Running average acc += w·(x − acc) per pixel, with w set by motion.
+
+    w is `alpha` (≈ 1/alpha frames of memory) where the new frame differs from
+    the running average by less than `lo`·σ, ramps up to 1 (take the frame as
+    is) at `hi`·σ, so moving objects do not trail.  σ, the frame‑to‑frame noise
+    level, is tracked from the median difference on a subsampled grid, so the
+    thresholds follow the gain of the footage.  The weight is a 256‑entry table
+    over the uint8 difference; state is a float32 accumulator plus scratch
+    planes, allocated once per frame size.  Per pixel apart from σ, which is a
+    whole‑frame statistic — per strip it would set a different threshold in
+    every band — so the chain never splits this engine.
+    """
+
+    name  = "temporal"
+    align = 1
+    halo  = 0
+    split = False
+
+    def __init__(self, alpha=0.2, lo=2.0, hi=4.0, min_thresh=4.0, step=4):
+        self.alpha, self.lo, self.hi = alpha, lo, hi
+        self.min_thresh, self.step = min_thresh, step
+        self.shape = self.sigma = None
+        self.levels = np.arange(256, dtype=np.float32)
+
+    def _alloc(self, src):
+        self.shape = src.shape
+        self.acc   = src.astype(np.float32)
+        self.prev  = src.copy()
+        self.diff  = np.empty_like(src)
+        self.w     = np.empty(src.shape, np.float32)
+        self.d     = np.empty(src.shape, np.float32)
+
+    def weights(self):
+        t0 = max(self.min_thresh, self.lo * self.sigma)
+        t1 = max(t0 + 1.0, self.hi * self.sigma)
+        ramp = np.clip((self.levels - t0) / (t1 - t0), 0, 1)
+        return self.alpha + (1 - self.alpha) * ramp
+
+    def __call__(self, src, dst):
+        if src.shape != self.shape:
+            self._alloc(src)
+        cv2.absdiff(src, self.prev, dst=self.diff)
+        sigma = float(np.median(self.diff[::self.step, ::self.step])) / 0.6745
+        self.sigma = sigma if self.sigma is None else self.sigma + 0.1 * (sigma - self.sigma)
+        cv2.LUT(self.diff, self.weights(), dst=self.w)
+        cv2.subtract(src, self.acc, dst=self.d, dtype=cv2.CV_32F)
+        cv2.multiply(self.d, self.w, dst=self.d)
+        cv2.add(self.acc, self.d, dst=self.acc)
+        cv2.convertScaleAbs(self.acc, dst=self.prev)
+        np.copyto(dst, self.prev)
+        return dst
+
+
+# Ordered best quality → cheapest
+TIERS = {
+    "bilateral":         Bilateral,
+    "bilateral_half":    lambda: LowResBilateral(scale=2),
+    "bilateral_quarter": lambda: LowResBilateral(scale=4),
+    "guided":            FastGuided,
+}
+
+
+# Everything selectable by name; only TIERS take part in "auto"
+ENGINES = dict(TIERS, temporal=Temporal)
+
+
+def make_denoiser(name):
+    if name not in ENGINES:
+        raise ValueError(f"unknown denoise engine {name!r} (choose from {', '.join(ENGINES)}, auto)")
+    return ENGINES[name]()
+
+
+class TierController:
+    """Pick the best tier whose measured time fits what is left of the budget.
+
+    Stage times are smoothed with an EMA.  Tiers never measured count as
+    fitting, so each is tried once on start‑up; after that, every `probe_every`
+    frames the tier one step better than the current one is re‑measured so the
+    chain climbs back up when the machine gets less busy.
+    """
+
+    def __init__(self, budget_ms=33.0, names=tuple(TIERS), alpha=0.2, probe_every=90):
+        self.budget_ms   = budget_ms
+        self.names       = list(names)
+        self.ema         = dict.fromkeys(self.names)
+        self.alpha       = alpha
+        self.probe_every = probe_every
+        self.frame       = 0
+        self.current     = self.names[0]
+
+    def select(self, other_ms=0.0):
+        self.frame += 1
+        avail = self.budget_ms - other_ms
+        fits  = [n for n in self.names if self.ema[n] is None or self.ema[n] <= avail]
+        pick  = fits[0] if fits else self.names[-1]
+        i = self.names.index(pick)
+        if i > 0 and self.frame % self.probe_every == 0:
+            pick = self.names[i - 1]                         # probe one tier up
+        self.current = pick
+        return pick
+
+    def record(self, name, ms):
+        prev = self.ema[name]
+        self.ema[name] = ms if prev is None else prev + self.alpha * (ms - prev)
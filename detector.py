@@ -0,0 +1,453 @@
+"""
+YOLO detection from the bundled ONNX files, no torch / ultralytics
+Loads yolov8n / yolov8s / yolo_nas_s (.onnx) with onnxruntime when it is
+installed, otherwise cv2.dnn.  Startup is a model load instead of a torch
+import, and the per‑frame work is three array passes:
+
+  · letterbox  the frame is resized once and written straight into a
+               preallocated 1×3×S×S float blob (BGR→RGB and 1/255 in the same
+               copy); the grey padding is filled only when the frame size changes
+  · decode     all candidate rows at once — best class, confidence and
+               TARGET_SET mask by boolean indexing, boxes converted only for
+               the survivors
+  · NMS        one cv2.dnn.NMSBoxes call, class‑aware (boxes offset per class)
+
+Output layouts understood: YOLOv8 (1×(4+nc)×N), YOLOv5‑style with objectness
+(1×N×(5+nc)) and YOLO‑NAS (boxes 1×N×4 xyxy + scores 1×N×nc).
+DarknetDetector runs YOLOv4 / YOLOv4‑tiny (.cfg + .weights) through the same
+decode and NMS.  TiledDetector runs an ONNX Detector on overlapping
+native‑resolution tiles for small targets in 4K frames; MotionGatedDetector
+runs it only on crops around frame‑difference motion, with a periodic
+full‑frame refresh.
+
+    det  = Detector("yolov8n.onnx", classes={"person", "car"})
+    dets = det(frame)           # float32 (n, 6): x1, y1, x2, y2, conf, class_id
+    det.names[int(dets[0, 5])]
+"""
+
+import os
+import cv2
+import numpy as np
+
+from motion import GlobalShift
+
+try:
+    import onnxruntime as ort
+except ImportError:         # optional — cv2.dnn is the fallback
+    ort = None
+
+MODEL_PATH = "yolov8n.onnx"
+NAMES_PATH = "coco.names"
+INPUT_SIZE = 640
+PAD_VALUE  = 114            # letterbox grey used in YOLO training
+
+
+def int8_path(model_path):
+    """Where quantize.py writes the INT8 twin of an ONNX model."""
+    stem, ext = os.path.splitext(model_path)
+    return stem + ".int8" + ext
+
+
+def resolve_model(model_path, prefer_int8=True):
+    """The file a Detector will load: the INT8 twin when it exists and
+    onnxruntime is there to run it (cv2.dnn's QDQ support is partial)."""
+    q = int8_path(model_path)
+    if prefer_int8 and ort is not None and os.path.isfile(q) and os.path.getsize(q) >= 1024:
+        return q
+    return model_path
+
+
+class Detector:
+    """One ONNX YOLO model; __call__(frame) → (n, 6) detections in frame px.
+
+    `classes` (set of names, None = all) is applied before NMS, so filtered
+    classes cost nothing downstream.  `size` is the square network input,
+    read from the model when onnxruntime reports a static shape.  With
+    onnxruntime, a quantized `<model>.int8.onnx` next to the model is loaded
+    instead unless prefer_int8=False; `model_path` tells which one ran.
+    """
+
+    def __init__(self, model_path=MODEL_PATH, classes=None, conf=0.35, iou=0.45,
+                 size=INPUT_SIZE, names_path=NAMES_PATH, backend="auto", prefer_int8=True):
+        use_ort = backend == "onnxruntime" or (backend == "auto" and ort is not None)
+        if use_ort:
+            model_path = resolve_model(model_path, prefer_int8)
+        if not os.path.isfile(model_path) or os.path.getsize(model_path) < 1024:
+            raise RuntimeError(f"'{model_path}' is missing or not a real ONNX model "
+                               "(export one, e.g. `yolo export model=yolov8n.pt format=onnx`)")
+        if use_ort:
+            self.sess = ort.InferenceSession(model_path, providers=["CPUExecutionProvider"])
+            self.input_name = self.sess.get_inputs()[0].name
+            h, w = self.sess.get_inputs()[0].shape[2:4]
+            if isinstance(h, int) and isinstance(w, int):
+                size = h
+            self.net = None
+        else:
+            self.net = cv2.dnn.readNetFromONNX(model_path)
+            self.out_names = self.net.getUnconnectedOutLayersNames()
+            self.sess = None
+        self._setup(model_path, classes, conf, iou, size, names_path, batched=True)
+
+    def _setup(self, model_path, classes, conf, iou, size, names_path, batched):
+        """Backend‑independent state: class names and filter, thresholds, input blob."""
+        self.model_path = model_path
+        self.names = open(names_path).read().strip().splitlines()
+        self.conf, self.iou, self.size = conf, iou, size
+        self.class_mask = np.array([classes is None or n in classes for n in self.names])
+        self.blob = np.empty((1, 3, size, size), np.float32)
+        self.frame_hw = None
+        self.batched  = batched
+
+    # ── preprocessing ─────────────────────────────────────────────
+    def _layout(self, h, w):
+        """Letterbox geometry for an h × w frame; refills the padding."""
+        s = self.size
+        r = min(s / w, s / h)
+        nw, nh = round(w * r), round(h * r)
+        self.scale = (r, r)
+        self.pad = ((s - nw) // 2, (s - nh) // 2)
+        self.rs  = np.empty((nh, nw, 3), np.uint8)
+        self.blob.fill(PAD_VALUE / 255.0)
+        self.frame_hw = (h, w)
+
+    def letterbox(self, frame):
+        """frame (BGR uint8) → self.blob, reusing every buffer."""
+        if frame.shape[:2] != self.frame_hw:
+            self._layout(*frame.shape[:2])
+        nh, nw = self.rs.shape[:2]
+        cv2.resize(frame, (nw, nh), dst=self.rs, interpolation=cv2.INTER_LINEAR)
+        px, py = self.pad
+        np.multiply(self.rs.transpose(2, 0, 1)[::-1], np.float32(1 / 255.0),
+                    out=self.blob[0, :, py:py + nh, px:px + nw], casting="unsafe")
+        return self.blob
+
+    # ── inference ─────────────────────────────────────────────────
+    def forward(self, blob):
+        if self.sess is not None:
+            return self.sess.run(None, {self.input_name: blob})
+        self.net.setInput(blob)
+        return self.net.forward(self.out_names)
+
+    def forward_batch(self, blob):
+        """forward() of an N×3×S×S blob; one call per image if the model was
+        exported with a fixed batch of 1 (remembered after the first failure)."""
+        if self.batched:
+            try:
+                return self.forward(blob)
+            except Exception:
+                self.batched = False
+        outs = [self.forward(blob[j:j + 1]) for j in range(len(blob))]
+        return [np.concatenate(o) for o in zip(*outs)]
+
+    def decode(self, outs):
+        """Raw model outputs → (n, 6) in letterboxed‑input px, before NMS."""
+        nc = len(self.names)
+        if len(outs) == 2:                              # YOLO‑NAS: xyxy boxes + scores
+            a, b = (o.reshape(-1, o.shape[-1]) for o in outs)
+            boxes, scores = (a, b) if a.shape[1] == 4 else (b, a)
+            xyxy = True
+        else:
+            p = outs[0].reshape(outs[0].shape[-2:])
+            if p.shape[0] in (4 + nc, 5 + nc) and p.shape[0] < p.shape[1]:
+                p = p.T                                 # YOLOv8 is channel‑first
+            boxes = p[:, :4]
+            scores = p[:, 5:] * p[:, 4:5] if p.shape[1] == 5 + nc else p[:, 4:]
+            xyxy = False
+        return self._select(boxes, scores, xyxy)
+
+    def _select(self, boxes, scores, xyxy):
+        """Best class per row, confidence + class filter, survivors → xyxy."""
+        cls  = scores.argmax(1)
+        conf = scores[np.arange(len(cls)), cls]
+        keep = (conf >= self.conf) & self.class_mask[cls]
+        b, conf, cls = boxes[keep], conf[keep], cls[keep]
+        out = np.empty((len(b), 6), np.float32)
+        if xyxy:
+            out[:, :4] = b
+        else:
+            out[:, :2] = b[:, :2] - b[:, 2:4] / 2
+            out[:, 2:4] = b[:, :2] + b[:, 2:4] / 2
+        out[:, 4], out[:, 5] = conf, cls
+        return out
+
+    def nms(self, dets):
+        """Class‑aware NMS on (n, 6) detections; returns the kept rows."""
+        if not len(dets):
+            return dets
+        off = dets[:, 5:6] * (dets[:, :4].max() + 1)   # classes never overlap
+        xywh = np.hstack([dets[:, :2] + off, dets[:, 2:4] - dets[:, :2]])
+        idx = cv2.dnn.NMSBoxes(xywh.tolist(), dets[:, 4].tolist(), self.conf, self.iou)
+        return dets[np.asarray(idx, int).reshape(-1)]
+
+    def __call__(self, frame):
+        dets = self.nms(self.decode(self.forward(self.letterbox(frame))))
+        h, w = self.frame_hw
+        dets[:, [0, 2]] = ((dets[:, [0, 2]] - self.pad[0]) / self.scale[0]).clip(0, w)
+        dets[:, [1, 3]] = ((dets[:, [1, 3]] - self.pad[1]) / self.scale[1]).clip(0, h)
+        return dets
+
+
+# ── Darknet YOLOv4 (.cfg + .weights) ──────────────────────────────
+DARKNET_PROFILES = {                # name → (cfg, weights)
+    "yolov4": ("yolov4.cfg", "yolov4.weights"),
+    "tiny":   ("yolov4-tiny.cfg", "yolov4-tiny.weights"),     # ≈ 8× fewer FLOPs
+}
+
+
+class DarknetDetector(Detector):
+    """YOLOv4 / YOLOv4‑tiny through cv2.dnn.readNetFromDarknet.
+
+    The frame is stretched to the square input, as Darknet was trained, and
+    the yolo layers' rows (cx, cy, w, h normalised, objectness, nc scores
+    already weighted by objectness) are stacked and decoded in one pass.
+    `size` defaults to the cfg's width (608 for yolov4, 416 for tiny).
+    """
+
+    def __init__(self, profile="yolov4", classes=None, conf=0.35, iou=0.4,
+                 size=None, names_path=NAMES_PATH):
+        if profile not in DARKNET_PROFILES:
+            raise ValueError(f"unknown Darknet profile {profile!r} ({', '.join(DARKNET_PROFILES)})")
+        cfg, weights = DARKNET_PROFILES[profile]
+        if not os.path.isfile(cfg) or not os.path.isfile(weights):
+            raise RuntimeError(f"Darknet profile {profile!r} needs '{cfg}' and '{weights}'")
+        if size is None:
+            size = next(int(l.split("=")[1]) for l in open(cfg) if l.replace(" ", "").startswith("width="))
+        self.net  = cv2.dnn.readNetFromDarknet(cfg, weights)
+        self.out_names = self.net.getUnconnectedOutLayersNames()
+        self.sess = None
+        # yolo layers stack the rows of all images, so no batched forward
+        self._setup(weights, classes, conf, iou, size, names_path, batched=False)
+
+    def _layout(self, h, w):
+        s = self.size
+        self.scale = (s / w, s / h)
+        self.pad   = (0, 0)
+        self.rs    = np.empty((s, s, 3), np.uint8)
+        self.frame_hw = (h, w)
+
+    def decode(self, outs):
+        p = np.vstack([o.reshape(-1, o.shape[-1]) for o in outs])
+        return self._select(p[:, :4] * self.size, p[:, 5:], False)
+
+
+# ── Tiled inference for small targets ─────────────────────────────
+class TiledDetector:
+    """Detector on overlapping native‑res tiles of the full frame.
+
+    At 300 ft a person is a few dozen 4K pixels; shrinking the frame to the
+    network input leaves a handful.  Here the frame is cut into
+    `det.size` squares overlapping by at least `overlap` px (28 tiles for
+    4K at 640), all sent through one batched forward pass (one per tile if
+    the model has a fixed batch of 1), offset back into frame px and merged
+    with the detector's class‑aware NMS.  Boxes smaller than the overlap
+    that touch an inner tile edge are dropped — the neighbouring tile holds
+    them whole.
+
+    With skip_static, a tile none of whose 16×16 cells changed its mean by
+    `change` grey levels or more since the tile last ran keeps its previous
+    detections (the max, not the average, so one small newcomer counts);
+    every tile is re‑run at least every `refresh` passes.
+    """
+
+    def __init__(self, det, overlap=96, skip_static=True, change=8, refresh=10):
+        self.det, self.overlap = det, overlap
+        self.skip_static, self.change, self.refresh = skip_static, change, refresh
+        self.frame_hw = None
+
+    @staticmethod
+    def _starts(length, tile, overlap):
+        if length <= tile:
+            return [0]
+        n = -(-(length - overlap) // (tile - overlap))
+        return np.linspace(0, length - tile, n).round().astype(int).tolist()
+
+    @classmethod
+    def count(cls, w, h, size, overlap=96):
+        """Tiles per w × h frame at network input `size` (forward passes per call)."""
+        return len(cls._starts(w, size, overlap)) * len(cls._starts(h, size, overlap))
+
+    def _layout(self, h, w):
+        s = self.det.size
+        self.tw, self.th = min(s, w), min(s, h)
+        self.tiles = [(x, y) for y in self._starts(h, s, self.overlap)
+                      for x in self._starts(w, s, self.overlap)]
+        self.blob  = np.full((len(self.tiles), 3, s, s), PAD_VALUE / 255.0, np.float32)
+        self.thumbs = [None] * len(self.tiles)
+        self.cache  = [np.empty((0, 6), np.float32)] * len(self.tiles)
+        self.age    = [0] * len(self.tiles)
+        self.frame_hw = (h, w)
+
+    def _changed(self, small):
+        """Indices of tiles to run this pass (updates the stored thumbnails)."""
+        todo = []
+        for i, (x, y) in enumerate(self.tiles):
+            t = small[y // 16:(y + self.th) // 16, x // 16:(x + self.tw) // 16]
+            self.age[i] += 1
+            if (not self.skip_static or self.thumbs[i] is None or self.age[i] >= self.refresh
+                    or cv2.norm(t, self.thumbs[i], cv2.NORM_INF) >= self.change):
+                self.thumbs[i], self.age[i] = t.copy(), 0
+                todo.append(i)
+        return todo
+
+    def __call__(self, frame):
+        """frame (BGR uint8, any size) → (n, 6) detections in frame px."""
+        h, w = frame.shape[:2]
+        if (h, w) != self.frame_hw:
+            self._layout(h, w)
+        todo = list(range(len(self.tiles)))
+        if self.skip_static:
+            gray  = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            todo  = self._changed(cv2.resize(gray, (w // 16, h // 16), interpolation=cv2.INTER_AREA))
+        for j, i in enumerate(todo):
+            x, y = self.tiles[i]
+            np.multiply(frame[y:y + self.th, x:x + self.tw].transpose(2, 0, 1)[::-1],
+                        np.float32(1 / 255.0), out=self.blob[j, :, :self.th, :self.tw],
+                        casting="unsafe")
+        outs = self.det.forward_batch(self.blob[:len(todo)]) if todo else []
+        ov = self.overlap
+        for j, i in enumerate(todo):
+            x, y = self.tiles[i]
+            d = self.det.decode([o[j:j + 1] for o in outs])
+            d[:, [0, 2]] += x
+            d[:, [1, 3]] += y
+            small = (d[:, 2] - d[:, 0] < ov) & (d[:, 3] - d[:, 1] < ov)
+            inner = (((d[:, 0] <= x + 1) & (x > 0)) | ((d[:, 2] >= x + self.tw - 1) & (x + self.tw < w)) |
+                     ((d[:, 1] <= y + 1) & (y > 0)) | ((d[:, 3] >= y + self.th - 1) & (y + self.th < h)))
+            self.cache[i] = d[~(small & inner)]
+        dets = self.det.nms(np.concatenate(self.cache))
+        dets[:, [0, 2]] = dets[:, [0, 2]].clip(0, w)
+        dets[:, [1, 3]] = dets[:, [1, 3]].clip(0, h)
+        return dets
+
+
+# ── Motion‑gated inference ────────────────────────────────────────
+class MotionGatedDetector:
+    """Detector run only where the picture changed.
+
+    Motion is found as in the track5 scripts — blurred gray, absdiff,
+    threshold, dilate, external contours — on a `motion_w` px wide copy,
+    after undoing the camera's global shift (motion.GlobalShift) so drift
+    of a hovering drone is not flagged.  Each blob grows to a crop of at
+    least `crop` px (the network input: small movers stay at native res),
+    overlapping crops are merged, and all crops go through one batched
+    forward pass, each letterboxed into its row of the blob.
+
+    A full‑frame pass runs every `refresh` calls, when the camera cut or
+    moved too much to align, and when motion covers more than `max_area` of
+    the frame or needs more than `max_crops` crops.  Its detections stand
+    in for the still parts of the scene; crop results replace them inside
+    the crops and stand in turn (a target that stops keeps its box).  With
+    no motion nothing is run at all.
+    `mode` tells what the last call did ("full", "crops n", "idle").
+    """
+
+    def __init__(self, det, refresh=15, motion_w=640, thresh=12, min_area=4,
+                 crop=None, max_crops=4, max_area=0.3):
+        self.det, self.refresh, self.motion_w = det, refresh, motion_w
+        self.thresh, self.min_area = thresh, min_area
+        self.crop = crop or det.size
+        self.max_crops, self.max_area = max_crops, max_area
+        self.shift = GlobalShift(est_w=motion_w // 2)
+        self.prev  = None
+        self.age   = refresh
+        self.still = np.empty((0, 6), np.float32)
+        self.blob  = np.empty((max_crops, 3, det.size, det.size), np.float32)
+        self.mode  = "idle"
+
+    def _motion_boxes(self, frame):
+        """Moving blobs as [x1, y1, x2, y2] in frame px, or None if the frame
+        can't be compared with the previous one (first, cut, size change)."""
+        h, w = frame.shape[:2]
+        sw = min(self.motion_w, w)
+        small = cv2.resize(frame, (sw, round(h * sw / w)), interpolation=cv2.INTER_AREA)
+        gray  = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)     # INTER_AREA already averaged the noise
+        prev, self.prev = self.prev, gray
+        d = self.shift(gray)
+        if prev is None or prev.shape != gray.shape or d is None:
+            return None
+        dx, dy = d
+        sh, sw = gray.shape
+        prev = cv2.warpAffine(prev, np.float32([[1, 0, dx], [0, 1, dy]]), (sw, sh),
+                              borderMode=cv2.BORDER_REPLICATE)
+        mask = cv2.threshold(cv2.absdiff(prev, gray), self.thresh, 255, cv2.THRESH_BINARY)[1]
+        bx, by = int(np.ceil(abs(dx))) + 1, int(np.ceil(abs(dy))) + 1
+        mask[:by], mask[sh - by:], mask[:, :bx], mask[:, sw - bx:] = 0, 0, 0, 0
+        mask = cv2.dilate(mask, None, iterations=2)
+        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        k = w / sw
+        return [[x * k, y * k, (x + bw) * k, (y + bh) * k] for x, y, bw, bh in map(cv2.boundingRect, contours)
+                if bw * bh >= self.min_area]
+
+    def _crops(self, boxes, h, w):
+        """Blobs grown to ≥ crop px squares inside the frame, merged while
+        they overlap; [x1, y1, x2, y2] ints."""
+        c = self.crop
+        crops = []
+        for x1, y1, x2, y2 in boxes:
+            cw, ch = max(x2 - x1 + 32, c), max(y2 - y1 + 32, c)
+            cx = int(np.clip((x1 + x2 - cw) / 2, 0, max(w - cw, 0)))
+            cy = int(np.clip((y1 + y2 - ch) / 2, 0, max(h - ch, 0)))
+            crops.append([cx, cy, min(cx + int(cw), w), min(cy + int(ch), h)])
+        merged = True
+        while merged:
+            merged, out = False, []
+            for b in crops:
+                for a in out:
+                    if b[0] < a[2] and a[0] < b[2] and b[1] < a[3] and a[1] < b[3]:
+                        a[:] = [min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3])]
+                        merged = True
+                        break
+                else:
+                    out.append(b)
+            crops = out
+        return crops
+
+    def __call__(self, frame):
+        """frame (BGR uint8) → (n, 6) detections in frame px."""
+        h, w = frame.shape[:2]
+        boxes = self._motion_boxes(frame)
+        self.age += 1
+        crops = None
+        if boxes is not None and self.age < self.refresh:
+            area = sum((x2 - x1) * (y2 - y1) for x1, y1, x2, y2 in boxes)
+            if area <= self.max_area * h * w:
+                crops = self._crops(boxes, h, w)
+                if len(crops) > self.max_crops:
+                    crops = None
+        if crops is None:
+            self.still, self.age, self.mode = self.det(frame), 0, "full"
+            return self.still.copy()
+        if not crops:
+            self.mode = "idle"
+            return self.still.copy()
+
+        s = self.det.size
+        geo = []
+        for j, (x1, y1, x2, y2) in enumerate(crops):
+            r  = min(1.0, s / (x2 - x1), s / (y2 - y1))     # never enlarge
+            nw, nh = round((x2 - x1) * r), round((y2 - y1) * r)
+            rs = frame[y1:y2, x1:x2] if r == 1.0 else cv2.resize(frame[y1:y2, x1:x2], (nw, nh),
+                                                                   interpolation=cv2.INTER_AREA)
+            self.blob[j].fill(PAD_VALUE / 255.0)
+            np.multiply(rs.transpose(2, 0, 1)[::-1], np.float32(1 / 255.0),
+                        out=self.blob[j, :, :nh, :nw], casting="unsafe")
+            geo.append((x1, y1, r))
+        outs = self.det.forward_batch(self.blob[:len(crops)])
+        found = []
+        for j, (x1, y1, r) in enumerate(geo):
+            d = self.det.decode([o[j:j + 1] for o in outs])
+            d[:, [0, 2]] = d[:, [0, 2]] / r + x1
+            d[:, [1, 3]] = d[:, [1, 3]] / r + y1
+            found.append(d)
+        # still detections outside every crop keep standing
+        cx = (self.still[:, 0] + self.still[:, 2]) / 2
+        cy = (self.still[:, 1] + self.still[:, 3]) / 2
+        inside = np.zeros(len(self.still), bool)
+        for x1, y1, x2, y2 in crops:
+            inside |= (cx >= x1) & (cx < x2) & (cy >= y1) & (cy < y2)
+        self.mode = f"crops {len(crops)}"
+        dets = self.det.nms(np.concatenate(found + [self.still[~inside]]))
+        dets[:, [0, 2]] = dets[:, [0, 2]].clip(0, w)
+        dets[:, [1, 3]] = dets[:, [1, 3]].clip(0, h)
+        self.still = dets
+        return dets.copy()
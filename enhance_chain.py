@@ -0,0 +1,204 @@
+"""
+Night‑vision enhancement chain, built once and reused every frame
+Replaces the per‑frame body of enhance_drone_footage(): the CLAHE object and the
+sharpening kernel are created once, every stage runs on the single grayscale
+plane into preallocated buffers, and nothing is expanded to 3 channels unless
+the caller asks for it (cv2.imshow shows the gray plane as is).
+
+Brightness, contrast, gamma and an optional colour map are point‑wise, so they
+are folded into one 256‑entry lookup table that is rebuilt only when one of
+them changes (i.e. when a track‑bar moves) and applied in a single LUT pass.
+
+The bilateral stage is pluggable (see denoise.py): denoise="auto" lets a
+TierController pick the best engine that fits `budget_ms` per frame.  The
+stages after CLAHE can run strip‑parallel (see strip_executor.py); the
+stitched result is bit‑identical to the single‑pass one for every engine (the
+stateful temporal engine is never split) — `python enhance_chain.py
+[image|video]` checks that over a frame sequence of your own footage.
+
+    chain = NightVisionChain(clip_limit=6.0, tile_grid=(1, 1))
+    out   = chain.process(frame, brightness, contrast)     # uint8, 1 channel
+"""
+
+import sys
+import time
+import cv2
+import numpy as np
+from denoise import TierController, make_denoiser
+from strip_executor import StripExecutor
+
+SHARPEN = np.array([[-1, -1, -1],
+                    [-1,  9, -1],
+                    [-1, -1, -1]], np.float32)
+
+_RAMP = np.arange(256, dtype=np.uint8).reshape(256, 1)
+
+
+def point_lut(brightness=0.0, contrast=1.0, gamma=1.0, colormap=None):
+    """256‑entry table for saturate(contrast·x + brightness·255), then gamma,
+    then an optional cv2.COLORMAP_* (→ a (256, 1, 3) BGR table)."""
+    x = np.arange(256, dtype=np.float64) * contrast + brightness * 255
+    x = np.clip(np.rint(x), 0, 255)
+    if gamma != 1.0:
+        x = np.rint(255.0 * (x / 255.0) ** (1.0 / gamma))
+    lut = x.astype(np.uint8).reshape(256, 1)
+    if colormap is not None:
+        lut = cv2.applyColorMap(_RAMP, colormap)[lut[:, 0]]
+    return lut
+
+
+class _LocalStages:
+    """Gaussian → denoise → sharpen → LUT on one plane (the frame or one strip).
+
+    Every stage has a bounded footprint, which is what makes them safe to run
+    per strip; each strip gets its own buffers and denoise engines.
+    """
+
+    def __init__(self, blur_ksize):
+        self.blur_ksize = blur_ksize
+        self.engines    = {}
+        self.shape      = None
+
+    def engine(self, name):
+        if name not in self.engines:
+            self.engines[name] = make_denoiser(name)
+        return self.engines[name]
+
+    def halo(self, name):
+        return max(self.blur_ksize) // 2 + self.engine(name).halo + SHARPEN.shape[0] // 2
+
+    def __call__(self, src, name, lut, dst=None):
+        if src.shape != self.shape:
+            self.shape = src.shape
+            self.a, self.b = np.empty_like(src), np.empty_like(src)
+            self.out = np.empty(src.shape + lut.shape[2:], np.uint8)
+        if dst is None or dst.shape != src.shape + lut.shape[2:]:
+            dst = self.out
+        cv2.GaussianBlur(src, self.blur_ksize, 0, dst=self.a)     # noise
+        self.engine(name)(self.a, self.b)                        # edge‑preserving noise
+        cv2.filter2D(self.b, -1, SHARPEN, dst=self.a)             # sharpen
+        # brightness / contrast / gamma (/ colour map) in one table lookup
+        if lut.ndim == 3:
+            return cv2.applyColorMap(self.a, lut, dst=dst)
+        return cv2.LUT(self.a, lut, dst=dst)
+
+
+class NightVisionChain:
+    """gray → CLAHE → Gaussian → bilateral → sharpen → point LUT.
+
+    The returned image is owned by the chain and overwritten by the next call;
+    it is single‑channel unless a `colormap` is set.  With workers != 1 the
+    stages after CLAHE run on overlapping horizontal strips in parallel
+    (0 = one strip per CPU core); CLAHE and engines that declare split = False
+    (temporal) need whole‑frame statistics and always run on the full plane.
+    """
+
+    def __init__(self, clip_limit=6.0, tile_grid=(1, 1), blur_ksize=(5, 5),
+                 denoise="bilateral", budget_ms=33.0, gamma=1.0, colormap=None,
+                 workers=1):
+        self.clahe      = cv2.createCLAHE(clipLimit=clip_limit, tileGridSize=tile_grid)
+        self.blur_ksize = blur_ksize
+        self.tiers      = TierController(budget_ms) if denoise == "auto" else None
+        self.denoise    = denoise if not self.tiers else None
+        self.local      = [_LocalStages(blur_ksize)]
+        self.local[0].engine(self.denoise or self.tiers.names[0])   # validate the name now
+        self.other_ms   = 0.0       # EMA of the full‑frame stages (gray, CLAHE)
+        strips          = StripExecutor(workers or None) if workers != 1 else None
+        self.strips     = strips if strips and strips.workers > 1 else None
+        self.gamma      = gamma
+        self.colormap   = colormap
+        self.shape      = None
+        self.lut_key    = None
+        self.set_levels()
+
+    def set_levels(self, brightness=None, contrast=None):
+        """Rebuild the point LUT if any point‑wise parameter changed; None keeps
+        the current brightness / contrast (0.0 / 1.0 at first)."""
+        cur = self.lut_key[:2] if self.lut_key else (0.0, 1.0)
+        key = (cur[0] if brightness is None else brightness,
+               cur[1] if contrast is None else contrast, self.gamma, self.colormap)
+        if key != self.lut_key:
+            self.lut     = point_lut(*key)
+            self.lut_key = key
+
+    def _alloc(self, shape):
+        self.shape = shape
+        self.gray  = np.empty(shape, np.uint8)
+        self.a     = np.empty(shape, np.uint8)
+        self.out   = np.empty(shape, np.uint8)
+        self.bgr   = np.empty(shape + (3,), np.uint8)
+
+    def process(self, frame, brightness=None, contrast=None):
+        self.set_levels(brightness, contrast)
+        if frame.shape[:2] != self.shape:
+            self._alloc(frame.shape[:2])
+        t0 = time.perf_counter()
+        if frame.ndim == 3:
+            cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=self.gray)
+        else:
+            np.copyto(self.gray, frame)
+        self.clahe.apply(self.gray, dst=self.a)                   # local contrast
+        t1 = time.perf_counter()
+
+        name = self.tiers.select(self.other_ms) if self.tiers else self.denoise
+        lut  = self.lut
+        dst  = self.bgr if lut.ndim == 3 else self.out
+        if self.strips and self.local[0].engine(name).split:
+            align = self.local[0].engine(name).align
+            spans = self.strips.bounds(self.shape[0], align)
+            while len(self.local) < len(spans):
+                self.local.append(_LocalStages(self.blur_ksize))
+            self.strips.apply(lambda i, s: self.local[i](s, name, lut),
+                              self.a, self.local[0].halo(name), dst=dst, align=align)
+        else:
+            self.local[0](self.a, name, lut, dst=dst)
+
+        if self.tiers:
+            t2 = time.perf_counter()
+            self.other_ms += 0.2 * ((t1 - t0) * 1000 - self.other_ms)
+            self.tiers.record(name, (t2 - t1) * 1000)
+        return dst
+
+    def to_bgr(self, plane=None):
+        """Expand the result to 3 channels (only when a colour consumer needs it)."""
+        return cv2.cvtColor(self.out if plane is None else plane,
+                            cv2.COLOR_GRAY2BGR, dst=self.bgr)
+
+
+def check_strips(sequences, workers=4):
+    """Strip‑parallel vs single‑pass output per denoise engine → {name: max abs diff}.
+
+    Each sequence is a list of same‑size frames run through one fresh pair of
+    chains, so stateful engines (temporal) are compared frame after frame."""
+    from denoise import ENGINES
+    worst = dict.fromkeys(ENGINES, 0)
+    for name in ENGINES:
+        for frames in sequences:
+            one, split = NightVisionChain(denoise=name), NightVisionChain(denoise=name, workers=workers)
+            for frame in frames:
+                ref = one.process(frame).copy()
+                worst[name] = max(worst[name], int(cv2.absdiff(ref, split.process(frame)).max()))
+    return worst
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        img = cv2.imread(sys.argv[1])
+        if img is not None:
+            frames = [img]
+        else:
+            cap, frames = cv2.VideoCapture(sys.argv[1]), []
+            while len(frames) < 10:
+                ok, frame = cap.read()
+                if not ok:
+                    break
+                frames.append(frame)
+            cap.release()
+        sequences = [frames]
+    else:   # panning noisy scenes, sizes partly not multiples of 4
+        rng, sequences = np.random.default_rng(0), []
+        for h, w in ((271, 333), (720, 1280), (723, 1281)):
+            base = cv2.GaussianBlur(rng.integers(0, 255, (h, w, 3), np.uint8), (0, 0), 3)
+            sequences.append([cv2.add(np.roll(base, 2 * t, 1), rng.integers(0, 25, base.shape, np.uint8))
+                              for t in range(8)])
+    print(check_strips(sequences))
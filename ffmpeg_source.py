@@ -0,0 +1,107 @@
+"""
+FFmpeg subprocess ingest
+Reads raw frames from an `ffmpeg` pipe instead of cv2.VideoCapture.  Scaling and
+pixel‑format conversion happen inside ffmpeg, so a 4K stream never turns into a
+full‑res BGR array that the script immediately shrinks with cv2.resize.
+
+    src = FFmpegPipeSource(RTMP_URL, size=(2880, 900))
+    ok, frame = src.read()          # (900, 2880, 3) uint8
+"""
+
+import shutil, subprocess
+import cv2
+import numpy as np
+
+FFMPEG  = "ffmpeg"
+FFPROBE = "ffprobe"
+
+# bytes per pixel → output array shape
+PIX_FMTS = {"bgr24": 3, "rgb24": 3, "gray": 1}
+
+# Low‑latency demux: no probing, no input buffering, drop B‑frame reordering delay
+LOW_LATENCY_IN = ["-fflags", "nobuffer", "-flags", "low_delay",
+                  "-probesize", "32", "-analyzeduration", "0"]
+
+
+def probe_size(url, ffprobe=FFPROBE):
+    """Return (width, height) of the first video stream in `url`."""
+    out = subprocess.run(
+        [ffprobe, "-v", "error", "-select_streams", "v:0",
+         "-show_entries", "stream=width,height", "-of", "csv=p=0", url],
+        capture_output=True, text=True, timeout=30)
+    try:
+        w, h = map(int, out.stdout.strip().split(",")[:2])
+    except ValueError:
+        raise RuntimeError(f"ffprobe could not read the video size of {url}")
+    return w, h
+
+
+class FFmpegPipeSource:
+    """cv2.VideoCapture look‑alike backed by `ffmpeg ... -f rawvideo pipe:1`.
+
+    `size` scales inside ffmpeg (None keeps the native size, probed once);
+    `pix_fmt` may be "gray" for pipelines that only need luminance.  Like
+    cv2.VideoCapture.read(image), read(out) fills `out` in place when its shape
+    matches, otherwise a new buffer is allocated.
+    """
+
+    def __init__(self, url, size=None, pix_fmt="bgr24", ffmpeg=FFMPEG,
+                 low_latency=True, extra_input_args=()):
+        if pix_fmt not in PIX_FMTS:
+            raise ValueError(f"unsupported pix_fmt {pix_fmt!r}")
+        if shutil.which(ffmpeg) is None:
+            raise RuntimeError(f"'{ffmpeg}' not found. Install FFmpeg or add it to PATH.")
+
+        self.url  = url
+        self.size = tuple(size) if size else probe_size(url)
+        w, h, ch  = self.size[0], self.size[1], PIX_FMTS[pix_fmt]
+        self.shape = (h, w) if ch == 1 else (h, w, ch)
+        self.frame_bytes = w * h * ch
+
+        cmd = [ffmpeg, "-hide_banner", "-loglevel", "error", "-nostdin"]
+        if low_latency:
+            cmd += LOW_LATENCY_IN
+        cmd += list(extra_input_args) + ["-i", url, "-an", "-sn", "-dn"]
+        if size:
+            cmd += ["-vf", f"scale={w}:{h}"]
+        cmd += ["-pix_fmt", pix_fmt, "-f", "rawvideo", "pipe:1"]
+
+        # bufsize=0 → raw FileIO, so readinto() lands straight in the frame buffer
+        self.proc = subprocess.Popen(cmd, stdout=subprocess.PIPE,
+                                     stderr=subprocess.DEVNULL, bufsize=0)
+
+    def alloc(self):
+        """New frame buffer: a NumPy view over a bytearray the pipe reads into."""
+        return np.frombuffer(bytearray(self.frame_bytes), np.uint8).reshape(self.shape)
+
+    # ── cv2.VideoCapture interface ────────────────────────────────
+    def isOpened(self):
+        return self.proc.poll() is None
+
+    def read(self, image=None):
+        if image is None or image.shape != self.shape or not image.flags.c_contiguous:
+            image = self.alloc()
+        view, got = memoryview(image).cast("B"), 0
+        while got < self.frame_bytes:
+            n = self.proc.stdout.readinto(view[got:])
+            if not n:
+                return False, None
+            got += n
+        return True, image
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:  return float(self.size[0])
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT: return float(self.size[1])
+        return 0.0
+
+    def set(self, prop, value):
+        return False
+
+    def release(self):
+        if self.proc.poll() is None:
+            self.proc.terminate()
+            try:
+                self.proc.wait(timeout=2)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+        self.proc.stdout.close()
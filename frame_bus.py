@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Shared‑memory frame bus — decode the drone stream once, view it many times
+Run    : python frame_bus.py --url rtmp://127.0.0.1:1935/live/mavic3 --name mavic3
+Then point any vision script at it with DRONE_SOURCE=shm://mavic3 (the launcher
+does this for you while the bus is running).
+
+Layout of the shared block (all little‑endian int64 / float64):
+    header  [magic, width, height, channels, slots, seq, 0, 0]
+    seq[slots], stamp[slots]          per‑slot sequence number / decode time
+    frames[slots, height, width, ch]  uint8 ring
+A slot's seq is set to -1 while it is being written, so readers can detect and
+retry a torn copy (seqlock).
+"""
+
+import argparse, os, signal, sys, time
+import cv2
+import numpy as np
+from multiprocessing import shared_memory, resource_tracker
+
+MAGIC      = 0x44524F4E45425553     # "DRONEBUS"
+HDR_WORDS  = 8
+SEQ        = 5                      # header index of the latest published seq
+SLOTS      = 4
+POLL_S     = 0.002
+TORN_S     = 0.0001                 # first back‑off after a copy the writer overwrote
+STALE_S    = 5.0                    # readers give up after this long without a frame
+
+
+def _layout(slots):
+    tables = (HDR_WORDS + 2 * slots) * 8
+    return tables, (tables + 63) // 64 * 64      # frames start 64‑byte aligned
+
+
+def _attach(name, wait=0.0):
+    deadline = time.time() + wait
+    while True:                                  # the publisher may still be starting
+        try:
+            return _attach_once(name)
+        except FileNotFoundError:
+            if time.time() > deadline:
+                raise
+            time.sleep(0.1)
+
+
+def _attach_once(name):
+    try:                                         # Python 3.13+
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        shm = shared_memory.SharedMemory(name=name)
+        try:                                     # stop the tracker unlinking it on our exit
+            resource_tracker.unregister(shm._name, "shared_memory")
+        except Exception:
+            pass
+        return shm
+
+
+class _BusView:
+    """NumPy views over the shared block."""
+
+    def _map(self, slots, shape):
+        _, off = _layout(slots)
+        buf = self.shm.buf
+        self.hdr   = np.ndarray((HDR_WORDS,), np.int64, buf, 0)
+        self.seqs  = np.ndarray((slots,), np.int64, buf, HDR_WORDS * 8)
+        self.stamps = np.ndarray((slots,), np.float64, buf, (HDR_WORDS + slots) * 8)
+        self.frames = np.ndarray((slots,) + shape, np.uint8, buf, off)
+        self.slots, self.shape = slots, shape
+
+    def _drop_views(self):
+        self.hdr = self.seqs = self.stamps = self.frames = None
+
+
+class FrameBusWriter(_BusView):
+    """Owns the shared block and publishes frames into the ring."""
+
+    def __init__(self, name, shape, slots=SLOTS):
+        shape = tuple(shape) if len(shape) == 3 else tuple(shape) + (1,)
+        _, off = _layout(slots)
+        size = off + slots * int(np.prod(shape))
+        try:
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:                  # left over from a crashed publisher
+            stale = _attach(name); stale.close(); stale.unlink()
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        self._map(slots, shape)
+        self.seqs[:] = 0
+        self.hdr[:] = (0, shape[1], shape[0], shape[2], slots, 0, 0, 0)
+        self.hdr[0] = MAGIC                      # written last: block is now valid
+        self.seq = 0
+
+    def publish(self, frame, stamp=None):
+        self.seq += 1
+        i = self.seq % self.slots
+        self.seqs[i] = -1
+        np.copyto(self.frames[i], frame.reshape(self.shape))
+        self.stamps[i] = time.time() if stamp is None else stamp
+        self.seqs[i] = self.seq
+        self.hdr[SEQ] = self.seq
+
+    def close(self):
+        self._drop_views()
+        self.shm.close()
+        self.shm.unlink()
+
+
+class FrameBusReader(_BusView):
+    """cv2.VideoCapture look‑alike that reads the newest frame off the bus.
+
+    read() copies out of shared memory (into `image` when it fits), so the
+    returned frame is private to the caller; read_latest(timeout=, out=) takes
+    the same keywords as the other sources (timeout defaults to the reader's).  `seq`, `stamp` and `dropped` mean
+    the same as on video_source.LatestFrameGrabber.
+    """
+
+    def __init__(self, name, size=None, timeout=STALE_S):
+        self.shm = _attach(name, wait=timeout)
+        hdr = np.ndarray((HDR_WORDS,), np.int64, self.shm.buf, 0)
+        if hdr[0] != MAGIC:
+            self.shm.close()
+            raise RuntimeError(f"shared memory '{name}' is not a frame bus")
+        w, h, ch, slots = (int(v) for v in hdr[1:5])
+        self._map(slots, (h, w, ch))
+        self.out_shape = (h, w) if ch == 1 else (h, w, ch)
+        self.size    = tuple(size) if size else None
+        self.timeout = timeout
+        self.seq, self.stamp, self.dropped = 0, 0.0, 0
+
+    # ── cv2.VideoCapture interface ────────────────────────────────
+    def isOpened(self):
+        return self.frames is not None
+
+    def read(self, image=None):
+        ok, frame, _, _ = self.read_latest(out=image)
+        return ok, frame
+
+    def read_latest(self, *, timeout=None, out=None):
+        deadline = time.time() + (self.timeout if timeout is None else timeout)
+        image, nap = out, TORN_S
+        while self.frames is not None:
+            seq = int(self.hdr[SEQ])
+            if seq > self.seq:
+                i = seq % self.slots
+                if self.seqs[i] == seq:
+                    src = self.frames[i].reshape(self.out_shape)
+                    if self.size:
+                        image = cv2.resize(src, self.size, dst=image)
+                    else:
+                        if image is None or image.shape != self.out_shape:
+                            image = np.empty(self.out_shape, np.uint8)
+                        np.copyto(image, src)
+                    stamp = float(self.stamps[i])
+                    if self.seqs[i] == seq:              # not overwritten mid‑copy
+                        if self.seq:
+                            self.dropped += seq - self.seq - 1
+                        self.seq, self.stamp = seq, stamp
+                        return True, image, seq, stamp
+                wait, nap = nap, min(2 * nap, POLL_S)   # writer is on that slot: back off
+            else:
+                wait = POLL_S
+            if time.time() > deadline:
+                break
+            time.sleep(wait)
+        return False, None, self.seq, self.stamp
+
+    def latency(self):
+        return time.time() - self.stamp if self.stamp else 0.0
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:  return float((self.size or self.shape[1::-1])[0])
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT: return float((self.size or self.shape[1::-1])[1])
+        return 0.0
+
+    def set(self, prop, value):
+        return False
+
+    def release(self):
+        if self.frames is not None:
+            self._drop_views()
+            self.shm.close()
+
+
+# ── Publisher ──────────────────────────────────────────────────────
+def main():
+    from video_source import RTMP_URL, SOURCE_ENV, open_capture
+
+    ap = argparse.ArgumentParser(description="Decode one stream into a shared‑memory ring")
+    ap.add_argument("--url",  default=RTMP_URL)
+    ap.add_argument("--name", default="mavic3")
+    ap.add_argument("--slots", type=int, default=SLOTS)
+    ap.add_argument("--width",  type=int, default=0)      # 0 = native size
+    ap.add_argument("--height", type=int, default=0)
+    ap.add_argument("--backend", default=None)            # opencv / ffmpeg
+    args = ap.parse_args()
+
+    os.environ.pop(SOURCE_ENV, None)                      # never read our own bus
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0)) # launcher stop → unlink the block
+    size = (args.width, args.height) if args.width and args.height else None
+    cap  = open_capture(args.url, size=size, backend=args.backend)
+    if not cap.isOpened():
+        raise RuntimeError(f"❌  Couldn't open stream at {args.url}")
+
+    ok, frame, _, stamp = cap.read_latest()
+    if not ok:
+        raise RuntimeError("Stream opened but no frames received")
+    bus = FrameBusWriter(args.name, frame.shape, args.slots)
+    print(f"▶ frame bus shm://{args.name}  {frame.shape[1]}x{frame.shape[0]}  {args.slots} slots")
+    try:
+        while ok:
+            bus.publish(frame, stamp)
+            ok, frame, _, stamp = cap.read_latest()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        cap.release()
+        bus.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""
+Prerendered HUD overlays
+Buttons, borders and labels only change when the operator presses something,
+yet the viewers redrew every rectangle and putText (and, in the tracker,
+copied and alpha‑blended the whole frame) on every frame.
+
+HudLayer renders the static elements once into a premultiplied BGRA sprite and
+re‑renders only when its state key changes (toggle pressed, zoom changed,
+window resized).  Compositing touches only the bounding boxes of the drawn
+elements:  dst = dst·(1 − α) + premultiplied colour.
+
+GlyphCache covers dynamic text (FPS, time, GSD): each character is rendered
+once as a coverage mask, a string is the row of its glyphs, blended in one go.
+
+    hud = HudLayer()
+    hud.update((w, h), state_key, lambda c: c.rect((10, 10), (50, 40), (0, 255, 0), -1))
+    hud.composite(frame)
+    GlyphCache(cv2.FONT_HERSHEY_PLAIN, 1.0).draw(frame, "FPS 29.8", (10, 30), (0, 255, 255))
+"""
+
+import cv2
+import numpy as np
+
+
+class Canvas:
+    """Draw target handed to a HudLayer render function.
+
+    Shapes are drawn opaque in painter's order; `opacity` applies to the
+    finished layer as a whole (like cv2.addWeighted of a drawn copy).
+    Coordinates and arguments follow cv2.rectangle / line / putText.
+    """
+
+    def __init__(self, size):
+        w, h = size
+        self.premul = np.zeros((h, w, 3), np.float32)
+        self.alpha  = np.zeros((h, w), np.float32)
+        self.boxes  = []
+        self.mask   = np.zeros((h, w), np.uint8)
+
+    def _paint(self, color, box):
+        x1, y1, x2, y2 = box
+        h, w = self.alpha.shape
+        x1, y1, x2, y2 = max(x1, 0), max(y1, 0), min(x2, w), min(y2, h)
+        if x1 >= x2 or y1 >= y2:
+            return
+        m = self.mask[y1:y2, x1:x2].astype(np.float32) / 255.0
+        self.premul[y1:y2, x1:x2] *= (1 - m)[..., None]
+        self.premul[y1:y2, x1:x2] += m[..., None] * np.float32(color[:3])
+        self.alpha[y1:y2, x1:x2] += m * (1 - self.alpha[y1:y2, x1:x2])
+        self.mask[y1:y2, x1:x2] = 0
+        self.boxes.append((x1, y1, x2, y2))
+
+    @staticmethod
+    def _pad(t):
+        return max(t, 1) + 1
+
+    def rect(self, p1, p2, color, thickness=1, line_type=cv2.LINE_8):
+        cv2.rectangle(self.mask, p1, p2, 255, thickness, line_type)
+        p = self._pad(thickness)
+        self._paint(color, (min(p1[0], p2[0]) - p, min(p1[1], p2[1]) - p,
+                            max(p1[0], p2[0]) + p + 1, max(p1[1], p2[1]) + p + 1))
+
+    def line(self, p1, p2, color, thickness=1, line_type=cv2.LINE_8):
+        cv2.line(self.mask, p1, p2, 255, thickness, line_type)
+        p = self._pad(thickness)
+        self._paint(color, (min(p1[0], p2[0]) - p, min(p1[1], p2[1]) - p,
+                            max(p1[0], p2[0]) + p + 1, max(p1[1], p2[1]) + p + 1))
+
+    def text(self, s, org, font, scale, color, thickness=1, line_type=cv2.LINE_AA):
+        (tw, th), base = cv2.getTextSize(s, font, scale, thickness)
+        cv2.putText(self.mask, s, org, font, scale, 255, thickness, line_type)
+        p = self._pad(thickness)
+        self._paint(color, (org[0] - p, org[1] - th - p, org[0] + tw + p, org[1] + base + p))
+
+
+def _merge_boxes(boxes):
+    """Union overlapping / touching boxes so no pixel is blended twice."""
+    boxes = sorted(boxes)
+    merged = True
+    while merged:
+        merged, out = False, []
+        for b in boxes:
+            for i, a in enumerate(out):
+                if b[0] <= a[2] and a[0] <= b[2] and b[1] <= a[3] and a[1] <= b[3]:
+                    out[i] = (min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3]))
+                    merged = True
+                    break
+            else:
+                out.append(b)
+        boxes = out
+    return boxes
+
+
+class HudLayer:
+    """Static overlay cached as a premultiplied BGRA sprite.
+
+    update(size, key, render) calls render(Canvas) only when (size, key)
+    differs from the last call; composite(img) blends the sprite into img
+    region by region.
+    """
+
+    def __init__(self, opacity=1.0):
+        self.opacity = opacity
+        self.key     = None
+        self.regions = []
+
+    def update(self, size, key, render):
+        if (size, key) == self.key:
+            return False
+        canvas = Canvas(size)
+        render(canvas)
+        a = canvas.alpha * self.opacity
+        self.sprite = np.dstack([canvas.premul * self.opacity, a * 255.0])
+        self.sprite = np.clip(np.rint(self.sprite), 0, 255).astype(np.uint8)   # BGRA, premultiplied
+        self.regions = []
+        for x1, y1, x2, y2 in _merge_boxes(canvas.boxes):
+            spr = self.sprite[y1:y2, x1:x2]
+            inv = cv2.cvtColor(255 - spr[..., 3], cv2.COLOR_GRAY2BGR)
+            self.regions.append((y1, y2, x1, x2, np.ascontiguousarray(spr[..., :3]), inv))
+        self.key = (size, key)
+        return True
+
+    def composite(self, img):
+        for y1, y2, x1, x2, premul, inv in self.regions:
+            roi = img[y1:y2, x1:x2]
+            cv2.multiply(roi, inv, dst=roi, scale=1 / 255.0)
+            cv2.add(roi, premul, dst=roi)
+        return img
+
+
+class GlyphCache:
+    """Per‑character coverage masks for one font / scale / thickness."""
+
+    def __init__(self, font=cv2.FONT_HERSHEY_PLAIN, scale=1.0, thickness=1, line_type=cv2.LINE_AA):
+        self.font, self.scale, self.thickness, self.line_type = font, scale, thickness, line_type
+        (_, ascent), base = cv2.getTextSize("Ag|", font, scale, thickness)
+        pad = 2 * thickness + 2     # getTextSize under‑reports strokes and AA fringes
+        self.top     = ascent + pad                    # baseline row inside a glyph mask
+        self.height  = self.top + base + pad
+        self.glyphs  = {}
+
+    def glyph(self, ch):
+        """(coverage mask, advance) of one character, rendered on first use."""
+        g = self.glyphs.get(ch)
+        if g is None:
+            w = cv2.getTextSize(ch, self.font, self.scale, self.thickness)[0][0]
+            m = np.zeros((self.height, w + 2 * self.thickness + 2), np.uint8)
+            cv2.putText(m, ch, (0, self.top), self.font, self.scale,
+                        255, self.thickness, self.line_type)
+            # fractional advance, so long strings do not drift from cv2.putText
+            run = cv2.getTextSize(ch * 16, self.font, self.scale, self.thickness)[0][0]
+            g = self.glyphs[ch] = (m, max(run - self.thickness, 0) / 16)
+        return g
+
+    def draw(self, img, text, org, color):
+        """Like cv2.putText(img, text, org, …, color): org is the baseline start."""
+        if not text:
+            return img
+        glyphs = [self.glyph(ch) for ch in text]
+        mask = np.zeros((self.height, int(sum(a for _, a in glyphs)) + glyphs[-1][0].shape[1]), np.uint8)
+        x = 0.0
+        for m, adv in glyphs:       # glyph edges overlap their neighbours by the stroke width
+            xi = int(round(x))
+            np.maximum(mask[:, xi:xi + m.shape[1]], m[:, :mask.shape[1] - xi],
+                       out=mask[:, xi:xi + m.shape[1]])
+            x += adv
+        x0, y0 = org[0], org[1] - self.top
+        h, w = img.shape[:2]
+        ax0, ay0 = max(x0, 0), max(y0, 0)
+        ax1, ay1 = min(x0 + mask.shape[1], w), min(y0 + mask.shape[0], h)
+        if ax0 >= ax1 or ay0 >= ay1:
+            return img
+        m3  = cv2.cvtColor(mask[ay0 - y0:ay1 - y0, ax0 - x0:ax1 - x0], cv2.COLOR_GRAY2BGR)
+        roi = img[ay0:ay1, ax0:ax1]
+        fg  = np.empty_like(roi)
+        fg[:] = color[:3]
+        cv2.multiply(fg, m3, dst=fg, scale=1 / 255.0)
+        cv2.multiply(roi, 255 - m3, dst=roi, scale=1 / 255.0)
+        cv2.add(roi, fg, dst=roi)
+        return img
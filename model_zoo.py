@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Detector registry, benchmark and auto‑selection
+Run    : python model_zoo.py bench [clip.mp4] [--models yolov8n yolov8s] [--sizes 640 320] [--force]
+         python model_zoo.py pick 15 [clip.mp4]
+
+Every bundled detector (ONNX through detector.Detector, Darknet profiles
+through detector.DarknetDetector) is listed in MODELS with its published COCO
+mAP.  `bench` measures each model × input size on this machine — per‑call
+latency (mean / p95), throughput and peak RSS — in a fresh subprocess per
+entry, on frames replayed from a recorded clip (replay_source, rate "fast";
+noise frames without one).  Results go to BENCH_CACHE, keyed by machine and
+model file, so a launch that calls pick() only benchmarks what is new.
+
+    from model_zoo import pick
+    det = pick(12, clip="flight.mp4", classes=TARGET_SET)   # most accurate ≥ 12 fps
+
+`cost(name, size)` tells pick() how many forward passes one detection call
+makes (tiles, crops), so the budget holds for tiled / gated detection too.
+"""
+
+import argparse, json, os, platform, subprocess, sys, time
+import cv2
+import numpy as np
+
+BENCH_CACHE  = "model_bench.json"
+BENCH_FRAMES = 40
+BENCH_WARMUP = 3
+MEASURE_TAG  = "MEASURE "
+
+# name → kind, file(s), input sizes to try, COCO val mAP50‑95 of the reference model
+MODELS = {
+    "yolo_nas_s":  dict(kind="onnx",    path="yolo_nas_s.onnx", sizes=(640, 480, 320), map=47.5),
+    "yolov8s":     dict(kind="onnx",    path="yolov8s.onnx",    sizes=(640, 480, 320), map=44.9),
+    "yolov4":      dict(kind="darknet", path="yolov4.weights",  sizes=(608, 416),      map=43.5),
+    "yolov8n":     dict(kind="onnx",    path="yolov8n.onnx",    sizes=(640, 480, 320), map=37.3),
+    "yolov4-tiny": dict(kind="darknet", path="yolov4-tiny.weights", sizes=(416, 320),  map=21.7),
+}
+DARKNET_PROFILE = {"yolov4": "yolov4", "yolov4-tiny": "tiny"}
+
+
+def load(name, size=None, **kw):
+    """Detector for registry entry `name` at input `size` (None = its first)."""
+    from detector import Detector, DarknetDetector
+    m = MODELS[name]
+    size = size or m["sizes"][0]
+    if m["kind"] == "darknet":
+        return DarknetDetector(DARKNET_PROFILE[name], size=size, **kw)
+    return Detector(m["path"], size=size, **kw)
+
+
+# ── measuring (one model × size per process) ──────────────────────
+def _frames(clip, n):
+    if clip:
+        from replay_source import FileReplaySource
+        src = FileReplaySource(clip, rate="fast", loop=True)
+        frames = [src.read()[1].copy() for _ in range(min(n, 30))]
+        src.release()
+        return frames
+    rng = np.random.default_rng(0)
+    base = cv2.GaussianBlur(rng.integers(0, 255, (720, 1280, 3), np.uint8), (0, 0), 3)
+    return [cv2.add(base, rng.integers(0, 20, base.shape, np.uint8)) for _ in range(5)]
+
+
+def measure(name, size, clip=None, frames=BENCH_FRAMES):
+    """Latency / throughput / peak RSS of one entry, in this process.
+
+    `size` in the result is the input the detector really ran at — a
+    static‑shape export keeps its own, whatever was asked for."""
+    import psutil
+    proc = psutil.Process()
+    imgs = _frames(clip, frames)
+    det  = load(name, size)
+    for i in range(BENCH_WARMUP):
+        det(imgs[i % len(imgs)])
+    lat, peak = [], proc.memory_info().rss
+    t0 = time.perf_counter()
+    for i in range(frames):
+        t = time.perf_counter()
+        det(imgs[i % len(imgs)])
+        lat.append(time.perf_counter() - t)
+        peak = max(peak, proc.memory_info().rss)
+    wall = time.perf_counter() - t0
+    lat = np.array(lat) * 1000
+    return dict(size=det.size, ms_mean=round(float(lat.mean()), 2),
+                ms_p95=round(float(np.percentile(lat, 95)), 2),
+                fps=round(frames / wall, 2), peak_mb=round(peak / 2**20, 1))
+
+
+def _measure_subprocess(name, size, clip, frames):
+    clip = os.path.abspath(clip) if clip else ""        # the child runs in this directory
+    out = subprocess.run([sys.executable, os.path.abspath(__file__), "_measure", name, str(size),
+                          clip, str(frames)], capture_output=True, text=True,
+                         cwd=os.path.dirname(os.path.abspath(__file__)))
+    lines = [l for l in out.stdout.splitlines() if l.startswith(MEASURE_TAG)]
+    if not lines:
+        err = (out.stderr.strip().splitlines() or ["no output"])[-1]
+        return dict(error=err)
+    return json.loads(lines[-1][len(MEASURE_TAG):])
+
+
+# ── cache ─────────────────────────────────────────────────────────
+def machine_key():
+    try:
+        import onnxruntime
+        ort = onnxruntime.__version__
+    except ImportError:
+        ort = "none"
+    return f"{platform.node()}|{platform.processor() or platform.machine()}|{os.cpu_count()}|cv2 {cv2.__version__}|ort {ort}"
+
+
+def _entry_key(name, size):
+    from detector import resolve_model
+    path = MODELS[name]["path"]
+    if MODELS[name]["kind"] == "onnx":
+        path = resolve_model(path)          # a new INT8 twin is a new entry
+    stamp = f"{os.path.getsize(path)}:{int(os.path.getmtime(path))}" if os.path.isfile(path) else "missing"
+    return f"{name}@{size}|{os.path.basename(path)}|{stamp}"
+
+
+def _load_cache(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def benchmark(clip=None, names=None, sizes=None, frames=BENCH_FRAMES, force=False,
+              cache=BENCH_CACHE, verbose=True):
+    """{(name, size): result} for this machine; measures only what the cache lacks.
+
+    Failures are reported but not cached, so they are retried next time.
+    Results are keyed by the size that really ran; a size the model cannot
+    take (static‑shape export) is dropped."""
+    data = _load_cache(cache)
+    mine = data.setdefault(machine_key(), {})
+    results = {}
+    for name in names or MODELS:
+        for size in sizes or MODELS[name]["sizes"]:
+            key = _entry_key(name, size)
+            r = mine.get(key)
+            if force or r is None or "error" in r:
+                if verbose:
+                    print(f"⏱️  benchmarking {name} @ {size} …", flush=True)
+                r = _measure_subprocess(name, size, clip, frames)
+                if "error" in r:
+                    mine.pop(key, None)             # retried on the next run
+                else:
+                    mine[key] = r
+                with open(cache, "w") as f:
+                    json.dump(data, f, indent=1)
+            ran = r.get("size", size)
+            if ran == size or "error" in r:
+                results[(name, size)] = r
+            elif verbose:
+                print(f"ℹ️  {name} has a fixed {ran} input — {size} skipped", flush=True)
+    return results
+
+
+def pick(min_fps, clip=None, kinds=None, verbose=True, cost=None, **kw):
+    """Load the most accurate model (then the largest input) that runs at
+    ≥ min_fps here; the fastest working one if none does.  The measured fps
+    of one forward pass is divided by cost(name, size) when given."""
+    names = [n for n in MODELS if kinds is None or MODELS[n]["kind"] in kinds]
+    ok = {k: r for k, r in benchmark(clip, names, verbose=verbose).items() if "error" not in r}
+    if not ok:
+        raise RuntimeError("no detector model could be loaded — see `python model_zoo.py bench`")
+    fps  = {k: r["fps"] / (cost(*k) if cost else 1) for k, r in ok.items()}
+    fast = [k for k in ok if fps[k] >= min_fps]
+    name, size = (max(fast, key=lambda k: (MODELS[k[0]]["map"], k[1])) if fast
+                  else max(ok, key=fps.get))
+    if verbose:
+        note = "" if fast else f" (nothing reaches {min_fps} fps, fastest chosen)"
+        print(f"🎯  detector: {name} @ {size}, {fps[(name, size)]:.1f} fps{note}")
+    return load(name, size, **kw)
+
+
+# ── CLI ────────────────────────────────────────────────────────────
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "_measure":
+        name, size, clip, frames = sys.argv[2:6]
+        print(MEASURE_TAG + json.dumps(measure(name, int(size), clip or None, int(frames))), flush=True)
+        return
+
+    ap  = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    b = sub.add_parser("bench", help="measure every model × input size on this machine")
+    b.add_argument("clip", nargs="?", help="recorded clip to replay (noise frames if omitted)")
+    b.add_argument("--models", nargs="+", choices=list(MODELS))
+    b.add_argument("--sizes", nargs="+", type=int)
+    b.add_argument("--frames", type=int, default=BENCH_FRAMES)
+    b.add_argument("--force", action="store_true", help="ignore cached results")
+    p = sub.add_parser("pick", help="show which model pick() would load")
+    p.add_argument("fps", type=float)
+    p.add_argument("clip", nargs="?")
+    args = ap.parse_args()
+
+    if args.cmd == "pick":
+        pick(args.fps, args.clip)
+        return
+    for (name, size), r in benchmark(args.clip, args.models, args.sizes, args.frames, args.force).items():
+        if "error" in r:
+            print(f"{name:<12} {size:>4}   unavailable: {r['error']}")
+        else:
+            print(f"{name:<12} {size:>4}   {r['ms_mean']:>7.1f} ms mean  {r['ms_p95']:>7.1f} ms p95  "
+                  f"{r['fps']:>6.1f} fps  {r['peak_mb']:>7.1f} MB peak  mAP {MODELS[name]['map']}")
+
+
+if __name__ == "__main__":
+    main()
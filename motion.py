@@ -0,0 +1,85 @@
+"""
+Global frame‑to‑frame motion
+GlobalShift measures how far the whole scene moved between consecutive frames
+with cv2.phaseCorrelate on a small pyramid level of the gray frame (≈ `est_w`
+px wide), so the cost is independent of the stream resolution.  Stabilizer
+turns that into a smoothed camera trajectory and reports the jitter as an
+offset to add to a crop origin — the crop moves, nothing is warped.
+
+    shift = GlobalShift()
+    d     = shift(frame)        # (dx, dy) full‑res px of content motion, None if unreliable
+
+    stab  = Stabilizer()
+    ox, oy = stab.update(frame)
+    roi   = frame[y1 + oy : …, x1 + ox : …]
+"""
+
+import cv2
+import numpy as np
+
+
+class GlobalShift:
+    def __init__(self, est_w=320, min_response=0.1, max_shift=0.25):
+        self.est_w, self.min_response, self.max_shift = est_w, min_response, max_shift
+        self.shape = None
+
+    def reset(self):
+        self.shape = None
+
+    def _small(self, frame):
+        g = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        for _ in range(self.levels):
+            g = cv2.pyrDown(g)
+        return g.astype(np.float32)
+
+    def __call__(self, frame):
+        """Translation of this frame's content vs the previous frame: (0, 0)
+        on the first frame, None when the correlation peak is too weak or
+        the shift implausibly large (scene cut, fast rotation)."""
+        if frame.shape != self.shape:
+            self.shape, self.levels, w = frame.shape, 0, frame.shape[1]
+            while w // 2 >= self.est_w:
+                w //= 2
+                self.levels += 1
+            self.prev = self._small(frame)
+            self.window = cv2.createHanningWindow(self.prev.shape[::-1], cv2.CV_32F)
+            return 0.0, 0.0
+        small = self._small(frame)
+        (dx, dy), response = cv2.phaseCorrelate(self.prev, small, self.window)
+        self.prev = small
+        scale = 1 << self.levels
+        dx, dy = dx * scale, dy * scale
+        h, w = self.shape[:2]
+        if response < self.min_response or abs(dx) > self.max_shift * w or abs(dy) > self.max_shift * h:
+            return None
+        return dx, dy
+
+
+class Stabilizer:
+    """Camera path = running sum of GlobalShift; its EMA (`smooth` per frame)
+    is the intended motion, the difference is jitter.  The offset is clamped
+    to `max_offset` of the frame size, and an unreliable estimate re‑centres."""
+
+    def __init__(self, smooth=0.1, max_offset=0.05, est_w=480):
+        self.smooth, self.max_offset = smooth, max_offset
+        self.shift = GlobalShift(est_w)
+        self.reset()
+
+    def reset(self):
+        self.shift.reset()
+        self.path = np.zeros(2)
+        self.ema  = np.zeros(2)
+
+    def update(self, frame):
+        """(ox, oy): whole pixels to add to a crop origin this frame."""
+        d = self.shift(frame)
+        if d is None:
+            self.reset()
+            return 0, 0
+        self.path += d
+        self.ema  += self.smooth * (self.path - self.ema)
+        h, w = frame.shape[:2]
+        lim = self.max_offset * np.array([w, h])
+        off = np.clip(self.path - self.ema, -lim, lim)
+        self.ema = self.path - off            # clamping means following the pan
+        return int(round(off[0])), int(round(off[1]))
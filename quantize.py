@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+INT8 quantization of the ONNX detectors, with an accuracy / speed report
+Run    : python quantize.py calibrate yolov8s.onnx flight1.mp4 [flight2.mp4 …] [--frames 200]
+         python quantize.py calibrate all flight1.mp4 …        # every bundled ONNX detector
+         python quantize.py report yolov8s.onnx heldout/ [--out yolov8s_int8.md] [--size 640]
+
+`calibrate` writes <model>.int8.onnx with onnxruntime's static QDQ quantization
+(per‑channel INT8 weights, UINT8 activations).  Activation ranges come from
+frames sampled evenly across the recorded flights, letterboxed exactly as
+detector.Detector feeds the network.  The decode tail after the last learned
+convolutions (YOLOv8's DFL, sigmoid and the Concat of pixel boxes with 0–1
+scores) stays float: one shared UINT8 scale would round every score to 0.
+detector.Detector then loads the INT8 file automatically (onnxruntime backend).
+
+`report` runs FP32 and INT8 on a held‑out labelled set — YOLO layout,
+images/*.jpg|png + labels/<stem>.txt with "class cx cy w h" normalised — and
+prints COCO‑style mAP50 / mAP50‑95 and per‑frame latency side by side.
+Needs onnxruntime and onnx (pip install onnxruntime onnx).
+"""
+
+import argparse, glob, os, sys, time
+import cv2
+import numpy as np
+
+from detector import Detector, INPUT_SIZE, int8_path
+
+CALIB_FRAMES = 200
+IOU_THRS     = np.linspace(0.5, 0.95, 10)
+
+
+def _ort_quant():
+    try:
+        from onnxruntime import quantization
+    except ImportError:
+        raise RuntimeError("INT8 quantization needs onnxruntime and onnx (pip install onnxruntime onnx)") from None
+    return quantization
+
+
+# ── calibration ───────────────────────────────────────────────────
+def sample_frames(clips, n=CALIB_FRAMES):
+    """≈ n frames spread evenly over all clips (by their frame counts)."""
+    counts = []
+    for c in clips:
+        cap = cv2.VideoCapture(c)
+        if not cap.isOpened():
+            raise RuntimeError(f"cannot open '{c}'")
+        counts.append(int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) or 1)
+        cap.release()
+    total = sum(counts)
+    for c, count in zip(clips, counts):
+        want = set(np.linspace(0, count - 1, max(1, round(n * count / total))).astype(int).tolist())
+        cap = cv2.VideoCapture(c)
+        i = 0
+        while want and cap.grab():
+            if i in want:
+                ok, frame = cap.retrieve()
+                if ok:
+                    yield frame
+                want.discard(i)
+            i += 1
+        cap.release()
+
+
+def head_nodes(model_path):
+    """Names of the nodes between the last learned Conv and the outputs.
+
+    Walks back from every graph output and stops at Conv nodes, except a
+    Conv fed by a Softmax — YOLOv8's DFL, a fixed expectation over box bins,
+    is decoding too."""
+    import onnx
+    graph = onnx.load(model_path, load_external_data=False).graph
+    producer = {o: n for n in graph.node for o in n.output}
+    tail, todo = set(), [o.name for o in graph.output]
+    while todo:
+        n = producer.get(todo.pop())
+        if n is None or n.name in tail:
+            continue
+        if n.op_type == "Conv" and not any(i in producer and producer[i].op_type == "Softmax"
+                                           for i in n.input):
+            continue
+        tail.add(n.name)
+        todo.extend(n.input)
+    return sorted(tail)
+
+
+def calibrate(model_path, clips, frames=CALIB_FRAMES, out=None, size=INPUT_SIZE):
+    """Write the INT8 twin of `model_path`; returns its path."""
+    q = _ort_quant()
+    det = Detector(model_path, size=size, backend="onnxruntime", prefer_int8=False)
+    name = det.input_name
+
+    class Reader(q.CalibrationDataReader):
+        def __init__(self):
+            self.it = sample_frames(clips, frames)
+
+        def get_next(self):
+            frame = next(self.it, None)
+            return None if frame is None else {name: det.letterbox(frame).copy()}
+
+    out = out or int8_path(model_path)
+    q.quantize_static(model_path, out, Reader(), quant_format=q.QuantFormat.QDQ,
+                      per_channel=True, activation_type=q.QuantType.QUInt8,
+                      weight_type=q.QuantType.QInt8, calibrate_method=q.CalibrationMethod.MinMax,
+                      nodes_to_exclude=head_nodes(model_path))
+    return out
+
+
+# ── evaluation ────────────────────────────────────────────────────
+def load_labelled(root):
+    """[(image path, gt (m, 5): x1, y1, x2, y2, class)] from a YOLO‑layout folder."""
+    items = []
+    for img in sorted(glob.glob(os.path.join(root, "images", "*"))):
+        if os.path.splitext(img)[1].lower() not in (".jpg", ".jpeg", ".png", ".bmp"):
+            continue
+        lab = os.path.join(root, "labels", os.path.splitext(os.path.basename(img))[0] + ".txt")
+        rows = np.loadtxt(lab, ndmin=2) if os.path.isfile(lab) and os.path.getsize(lab) else np.empty((0, 5))
+        items.append((img, rows))
+    if not items:
+        raise RuntimeError(f"no images under '{os.path.join(root, 'images')}'")
+    return items
+
+
+def _to_xyxy(rows, h, w):
+    gt = np.empty((len(rows), 5), np.float32)
+    gt[:, 0] = (rows[:, 1] - rows[:, 3] / 2) * w
+    gt[:, 1] = (rows[:, 2] - rows[:, 4] / 2) * h
+    gt[:, 2] = (rows[:, 1] + rows[:, 3] / 2) * w
+    gt[:, 3] = (rows[:, 2] + rows[:, 4] / 2) * h
+    gt[:, 4] = rows[:, 0]
+    return gt
+
+
+def _iou(a, b):
+    """IoU matrix of xyxy boxes a (n, 4) × b (m, 4)."""
+    lt = np.maximum(a[:, None, :2], b[None, :, :2])
+    rb = np.minimum(a[:, None, 2:4], b[None, :, 2:4])
+    inter = np.prod(np.clip(rb - lt, 0, None), axis=2)
+    area = lambda x: (x[:, 2] - x[:, 0]) * (x[:, 3] - x[:, 1])
+    return inter / (area(a)[:, None] + area(b)[None] - inter + 1e-9)
+
+
+def mean_ap(preds, gts):
+    """COCO‑style mAP (101‑point) per IoU threshold, averaged over classes.
+
+    preds / gts: per image, (n, 6) detections and (m, 5) ground truth in px.
+    Returns (mAP50, mAP50‑95)."""
+    classes = np.unique(np.concatenate([g[:, 4] for g in gts])) if gts else []
+    aps = np.zeros((len(classes), len(IOU_THRS)))
+    for ci, c in enumerate(classes):
+        n_gt = sum(int((g[:, 4] == c).sum()) for g in gts)
+        dets = [(p[k, 4], i, k) for i, p in enumerate(preds) for k in np.nonzero(p[:, 5] == c)[0]]
+        dets.sort(key=lambda d: -d[0])
+        tp = np.zeros((len(dets), len(IOU_THRS)), bool)
+        used = {i: np.zeros((int((g[:, 4] == c).sum()), len(IOU_THRS)), bool) for i, g in enumerate(gts)}
+        for j, (_, i, k) in enumerate(dets):
+            g = gts[i][gts[i][:, 4] == c]
+            if not len(g):
+                continue
+            iou = _iou(preds[i][k:k + 1, :4], g[:, :4])[0]
+            for t, thr in enumerate(IOU_THRS):
+                cand = np.where((iou >= thr) & ~used[i][:, t], iou, -1)
+                best = int(cand.argmax())
+                if cand[best] >= 0:
+                    used[i][best, t] = tp[j, t] = True
+        if not n_gt:
+            continue
+        ctp = np.cumsum(tp, 0)
+        recall = ctp / n_gt
+        precision = ctp / np.arange(1, len(dets) + 1)[:, None]
+        for t in range(len(IOU_THRS)):
+            p = np.maximum.accumulate(np.concatenate([precision[:, t], [0]])[::-1])[::-1]
+            r = np.concatenate([recall[:, t], [recall[-1, t] if len(dets) else 0]])
+            idx = np.searchsorted(r, np.linspace(0, 1, 101), side="left")
+            aps[ci, t] = np.where(idx < len(p), p[np.minimum(idx, len(p) - 1)], 0).mean()
+    if not len(classes):
+        return 0.0, 0.0
+    return float(aps[:, 0].mean()), float(aps.mean())
+
+
+def evaluate(det, items):
+    """mAP50, mAP50‑95 and per‑frame latency (mean / p95 ms) of `det`."""
+    preds, gts, lat = [], [], []
+    for path, rows in items:
+        img = cv2.imread(path)
+        h, w = img.shape[:2]
+        t = time.perf_counter()
+        preds.append(det(img))
+        lat.append(time.perf_counter() - t)
+        gts.append(_to_xyxy(rows, h, w))
+    lat = np.array(lat[1:] or lat) * 1000          # first call includes warm‑up
+    m50, m = mean_ap(preds, gts)
+    return dict(map50=m50, map=m, ms_mean=float(lat.mean()), ms_p95=float(np.percentile(lat, 95)))
+
+
+def report(model_path, root, out=None, size=INPUT_SIZE):
+    """FP32 vs INT8 table (markdown); also written to `out` if given."""
+    _ort_quant()
+    q = int8_path(model_path)
+    if not os.path.isfile(q):
+        raise RuntimeError(f"'{q}' not found — run `python quantize.py calibrate {model_path} <clips>` first")
+    items = load_labelled(root)
+    rows = [("FP32", model_path), ("INT8", q)]
+    res = {}
+    for tag, path in rows:
+        det = Detector(path, conf=0.001, iou=0.6, size=size, backend="onnxruntime", prefer_int8=False)
+        res[tag] = dict(evaluate(det, items), mb=os.path.getsize(path) / 2**20)
+    lines = [f"# {os.path.basename(model_path)}: FP32 vs INT8 ({len(items)} held‑out images)", "",
+             "| variant | mAP50 | mAP50‑95 | ms / frame | p95 ms | size MB |",
+             "|---|---|---|---|---|---|"]
+    for tag, _ in rows:
+        r = res[tag]
+        lines.append(f"| {tag} | {r['map50']:.3f} | {r['map']:.3f} | {r['ms_mean']:.1f} | "
+                     f"{r['ms_p95']:.1f} | {r['mb']:.1f} |")
+    f32, i8 = res["FP32"], res["INT8"]
+    lines += ["", f"INT8: {f32['ms_mean'] / i8['ms_mean']:.2f}× faster, "
+                  f"mAP50‑95 {i8['map'] - f32['map']:+.3f}"]
+    text = "\n".join(lines)
+    if out:
+        with open(out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    return text
+
+
+# ── CLI ────────────────────────────────────────────────────────────
+def main():
+    from model_zoo import MODELS
+
+    ap  = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    c = sub.add_parser("calibrate", help="write <model>.int8.onnx from recorded flights")
+    c.add_argument("model", help="ONNX model, or 'all' for every bundled ONNX detector")
+    c.add_argument("clips", nargs="+")
+    c.add_argument("--frames", type=int, default=CALIB_FRAMES)
+    c.add_argument("--size", type=int, default=INPUT_SIZE, help="network input (dynamic‑shape models)")
+    r = sub.add_parser("report", help="FP32 vs INT8 mAP and latency on a labelled set")
+    r.add_argument("model")
+    r.add_argument("dataset", help="folder with images/ and labels/ (YOLO format)")
+    r.add_argument("--out", help="also write the markdown report here")
+    r.add_argument("--size", type=int, default=INPUT_SIZE)
+    args = ap.parse_args()
+
+    if args.cmd == "report":
+        try:
+            print(report(args.model, args.dataset, args.out, args.size))
+        except RuntimeError as exc:
+            sys.exit(f"⚠️  {exc}")
+        return
+    models = ([m["path"] for m in MODELS.values() if m["kind"] == "onnx"]
+              if args.model == "all" else [args.model])
+    for m in models:
+        try:
+            print(f"✅  {m} → {calibrate(m, args.clips, args.frames, size=args.size)}")
+        except RuntimeError as exc:
+            print(f"⚠️  {m}: {exc}")
+            if args.model != "all":
+                sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Recorded‑clip replay for benchmarking without a drone
+Run    : python replay_source.py bench _NightVision_Rev5.py clip.mp4 [--rate fast]
+         python replay_source.py publish clip.mp4 [--url rtmp://127.0.0.1:1935/live/mavic3]
+
+`bench` runs a vision script with DRONE_SOURCE=<clip>; open_capture() then hands
+it a FileReplaySource and the script's throughput / per‑frame latency is printed
+when it releases the capture.  `publish` pushes the clip into the local RTMP
+endpoint (node‑media‑server) with ffmpeg, as a stand‑in for the drone.
+
+Replay rates:
+    fast  every frame, back to back, no drops — reproducible throughput numbers
+    pts   frames are released at their original timestamps; frames whose time
+          has passed while the script was busy are skipped, like a live feed
+"""
+
+import argparse, json, os, shutil, subprocess, sys, time
+import cv2
+import numpy as np
+
+RATE_ENV  = "DRONE_REPLAY"     # fast / pts (default pts)
+BENCH_ENV = "DRONE_BENCH"      # set → print a BENCH {...} line on release
+BENCH_TAG = "BENCH "
+
+
+class FileReplaySource:
+    """cv2.VideoCapture look‑alike that replays a recorded MP4/FLV."""
+
+    def __init__(self, path, rate="pts", size=None, loop=False):
+        if rate not in ("fast", "pts"):
+            raise ValueError(f"unknown replay rate {rate!r}")
+        self.cap  = cv2.VideoCapture(path)
+        self.path, self.rate, self.loop = path, rate, loop
+        self.size = tuple(size) if size else None
+        self.frame_s = 1.0 / (self.cap.get(cv2.CAP_PROP_FPS) or 30.0)
+        self.raw = None
+        self.t0 = self.pts0 = self.last_out = None
+        self.seq = self.dropped = 0
+        self.stamp = 0.0
+        self.busy = []                 # caller's time between successive reads (s)
+
+    def _grab(self):
+        if self.cap.grab():
+            return True
+        if not self.loop:
+            return False
+        self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+        self.t0 = None                 # restart the PTS clock
+        return self.cap.grab()
+
+    # ── cv2.VideoCapture interface ────────────────────────────────
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def read(self, image=None):
+        now = time.time()
+        if self.last_out is not None:
+            self.busy.append(now - self.last_out)
+        while True:
+            if not self._grab():
+                return False, None
+            if self.rate == "fast":
+                break
+            pts = self.cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+            if self.t0 is None:
+                self.t0, self.pts0 = time.time(), pts
+            due = self.t0 + pts - self.pts0
+            lag = time.time() - due
+            if lag > self.frame_s:     # the next frame is already due → skip this one
+                self.dropped += 1
+                continue
+            if lag < 0:
+                time.sleep(-lag)
+            break
+
+        if self.size:
+            ok, self.raw = self.cap.retrieve(self.raw)
+            image = cv2.resize(self.raw, self.size, dst=image) if ok else None
+        else:
+            ok, image = self.cap.retrieve(image)
+        self.seq  += ok
+        self.stamp = self.last_out = time.time()
+        if self.t0 is None:
+            self.t0 = self.stamp
+        return ok, image
+
+    def read_latest(self, *, timeout=None, out=None):
+        ok, frame = self.read(out)
+        return ok, frame, self.seq, self.stamp
+
+    def latency(self):
+        return time.time() - self.stamp if self.stamp else 0.0
+
+    def get(self, prop):
+        return self.cap.get(prop)
+
+    def set(self, prop, value):
+        return self.cap.set(prop, value)
+
+    def stats(self):
+        wall = (self.last_out - self.t0) if self.seq > 1 else 0.0
+        busy = np.array(self.busy) * 1000 if self.busy else np.zeros(1)
+        return dict(clip=os.path.basename(self.path), rate=self.rate,
+                    frames=self.seq, dropped=self.dropped,
+                    fps=round((self.seq - 1) / wall, 2) if wall else 0.0,
+                    ms_mean=round(float(busy.mean()), 2),
+                    ms_p95=round(float(np.percentile(busy, 95)), 2))
+
+    def release(self):
+        if os.environ.get(BENCH_ENV):
+            print(BENCH_TAG + json.dumps(self.stats()), flush=True)
+        self.cap.release()
+
+
+# ── CLI: bench / publish ───────────────────────────────────────────
+def bench(script, clip, rate="fast", runs=1):
+    """Run `script` on `clip` and return the BENCH stats of each run."""
+    script = os.path.abspath(script)                # it runs in its own directory
+    env = dict(os.environ, DRONE_SOURCE=os.path.abspath(clip),
+               DRONE_REPLAY=rate, DRONE_BENCH="1")
+    results = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, script], env=env, capture_output=True,
+                             text=True, cwd=os.path.dirname(script))
+        lines = [l for l in out.stdout.splitlines() if l.startswith(BENCH_TAG)]
+        if not lines:
+            raise RuntimeError(f"{script} produced no benchmark line:\n{out.stderr[-2000:]}")
+        results.append(dict(json.loads(lines[-1][len(BENCH_TAG):]), script=os.path.basename(script)))
+    return results
+
+
+def publish(clip, url, loop=True, ffmpeg="ffmpeg"):
+    """Push `clip` into an RTMP endpoint in real time (blocks until done)."""
+    if shutil.which(ffmpeg) is None:
+        raise RuntimeError(f"'{ffmpeg}' not found. Install FFmpeg or add it to PATH.")
+    cmd = [ffmpeg, "-hide_banner", "-loglevel", "error", "-re"]
+    if loop:
+        cmd += ["-stream_loop", "-1"]
+    cmd += ["-i", clip, "-an", "-c:v", "copy", "-f", "flv", url]
+    return subprocess.call(cmd)
+
+
+def main():
+    from video_source import RTMP_URL
+
+    ap  = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    b = sub.add_parser("bench", help="measure a vision script on a recorded clip")
+    b.add_argument("scripts", nargs="+", help="script(s) followed by the clip")
+    b.add_argument("--rate", choices=("fast", "pts"), default="fast")
+    b.add_argument("--runs", type=int, default=3)
+    p = sub.add_parser("publish", help="push a clip into the local RTMP server")
+    p.add_argument("clip")
+    p.add_argument("--url", default=RTMP_URL)
+    p.add_argument("--once", action="store_true", help="play once instead of looping")
+    args = ap.parse_args()
+
+    if args.cmd == "publish":
+        sys.exit(publish(args.clip, args.url, loop=not args.once))
+
+    *scripts, clip = args.scripts
+    for script in scripts:
+        for r in bench(script, clip, args.rate, args.runs):
+            print(f"{r['script']:<48} {r['frames']:>6} fr  {r['fps']:>7.2f} fps  "
+                  f"{r['ms_mean']:>7.2f} ms mean  {r['ms_p95']:>7.2f} ms p95  "
+                  f"{r['dropped']:>5} dropped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Strip‑parallel execution of local image filters
+Splits a frame into horizontal strips, extends each by a halo at least as large
+as the combined radius of the filters that run on it, processes the strips on a
+thread pool (OpenCV releases the GIL) and copies each strip's interior back, so
+the stitched result has no seams.
+
+    strips = StripExecutor(workers=4)
+    roi    = strips.apply(lambda i, s: cv2.filter2D(s, -1, usm), roi, halo=1)
+
+Only use it for filters whose output depends on a bounded neighbourhood
+(Gaussian, bilateral, filter2D, LUTs …) — not for CLAHE or anything that takes
+whole‑frame statistics.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+
+class StripExecutor:
+    """fn(strip_index, src_with_halo) → array with the same rows as its input.
+
+    `align` keeps strip boundaries and halos on multiples of that many rows
+    (needed by filters that work on a downscaled plane).  Strips are never
+    shorter than `min_rows`, so small ROIs simply run as one piece.  `parts`
+    caps the strips of one call below `workers` (callers that are already
+    parallel split less).  Without `dst` the result has src's shape and dtype.
+    """
+
+    def __init__(self, workers=None, min_rows=64):
+        self.workers  = workers or os.cpu_count() or 1
+        self.min_rows = min_rows
+        self.pool     = ThreadPoolExecutor(self.workers) if self.workers > 1 else None
+
+    def bounds(self, rows, align=1, parts=None):
+        n = max(1, min(parts or self.workers, self.workers, rows // max(self.min_rows, align)))
+        step = -(-rows // n)
+        step = -(-step // align) * align
+        return [(y, min(rows, y + step)) for y in range(0, rows, step)]
+
+    def apply(self, fn, src, halo, dst=None, align=1, parts=None):
+        rows = src.shape[0]
+        halo = -(-halo // align) * align
+        spans = self.bounds(rows, align, parts)
+        if len(spans) == 1 or self.pool is None:
+            out = fn(0, src)
+            if dst is None:
+                return out
+            np.copyto(dst, out)
+            return dst
+        if dst is None:
+            dst = np.empty_like(src)
+
+        def job(i, y0, y1):
+            a, b = max(0, y0 - halo), min(rows, y1 + halo)
+            out = fn(i, src[a:b])
+            dst[y0:y1] = out[y0 - a:y1 - a]
+
+        futures = [self.pool.submit(job, i, y0, y1) for i, (y0, y1) in enumerate(spans)]
+        for f in futures:
+            f.result()                      # re‑raises worker exceptions
+        return dst
+
+    def shutdown(self):
+        if self.pool:
+            self.pool.shutdown(wait=False)
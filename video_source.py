@@ -0,0 +1,162 @@
+"""
+Shared video input for the drone vision scripts
+Decodes the stream on a background thread and keeps only the newest frame, so a
+slow enhancement / YOLO stage can never let the picture drift behind the drone.
+
+    from video_source import open_capture
+    cap = open_capture(RTMP_URL)          # drop‑in for cv2.VideoCapture(...)
+    ok, frame = cap.read()                # always the newest decoded frame
+
+A frame returned by read() stays valid until the next read(); its buffer is then
+recycled for decoding, so hold a .copy() if you need it longer.
+"""
+
+import os, threading, time
+import cv2
+import numpy as np
+
+# ── Defaults ───────────────────────────────────────────────────────
+RTMP_URL    = "rtmp://127.0.0.1:1935/live/mavic3"
+SOURCE_ENV  = "DRONE_SOURCE"    # overrides the URL hard‑coded in a script
+BUS_SCHEME  = "shm://"          # shm://<name> reads a frame_bus.py publisher
+BACKEND_ENV = "DRONE_BACKEND"   # "opencv" (default) or "ffmpeg"
+# ───────────────────────────────────────────────────────────────────
+
+
+class LatestFrameGrabber:
+    """cv2.VideoCapture look‑alike whose read() returns only the newest frame.
+
+    Frames that arrive while the caller is still busy replace the pending one
+    and are counted in `dropped`.  `seq` / `stamp` describe the last frame
+    handed out (sequence number, time.time() when it was decoded).  With `size`
+    every frame is resized to (w, h) on the decode thread.  read_latest() has
+    the same keyword‑only signature on every source (FrameBusReader,
+    FileReplaySource), so they stay interchangeable.
+    """
+
+    def __init__(self, source, api=cv2.CAP_FFMPEG, size=None):
+        self.cap = cv2.VideoCapture(source, api) if isinstance(source, str) else source
+        self.size     = tuple(size) if size else None
+        self.cond     = threading.Condition()
+        self.frame    = self.out = None
+        self.spare    = []          # recycled buffers (at most 3 in flight)
+        self.seq      = self.latest_seq = 0
+        self.stamp    = self.latest_stamp = 0.0
+        self.decoded  = self.dropped = 0
+        self.running  = self.cap.isOpened()
+        self.done     = not self.running    # decode loop finished (or never started)
+        self.orphaned = False               # release() left cap.release() to the loop
+        self.thread   = threading.Thread(target=self._decode_loop, daemon=True)
+        if self.running:
+            self.thread.start()
+
+    # ── background decode ─────────────────────────────────────────
+    def _decode_loop(self):
+        try:
+            self._decode()
+        finally:
+            with self.cond:
+                self.done = True
+                orphaned  = self.orphaned
+            if orphaned:                    # release() timed out while we were in read()
+                self.cap.release()
+
+    def _decode(self):
+        raw = None
+        while self.running:
+            with self.cond:
+                buf = self.spare.pop() if self.spare else None
+            if self.size is None:
+                ok, frame = self.cap.read(buf)
+            else:
+                ok, raw = self.cap.read(raw)
+                frame = cv2.resize(raw, self.size, dst=buf) if ok else None
+            now = time.time()
+            with self.cond:
+                if not ok:
+                    self.running = False
+                elif self.running:
+                    if self.latest_seq > self.seq:      # previous never consumed
+                        self.dropped += 1
+                        self.spare.append(self.frame)
+                    self.frame = frame
+                    self.latest_seq  += 1
+                    self.latest_stamp = now
+                    self.decoded     += 1
+                self.cond.notify_all()
+
+    # ── cv2.VideoCapture interface ────────────────────────────────
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def read(self, image=None):
+        ok, frame, _, _ = self.read_latest(out=image)
+        return ok, frame
+
+    def read_latest(self, *, timeout=None, out=None):
+        """Block until a frame newer than the last one is ready.
+
+        Returns (ok, frame, seq, stamp); ok is False once the stream has ended
+        (after the last pending frame was delivered) or on timeout.  The frame
+        is copied into `out` when its shape fits, else it is the recycled buffer.
+        """
+        with self.cond:
+            fresh = self.cond.wait_for(
+                lambda: self.latest_seq > self.seq or not self.running, timeout)
+            if not fresh or self.latest_seq == self.seq:
+                return False, None, self.seq, self.stamp
+            if self.out is not None and self.out is not self.frame:
+                self.spare.append(self.out)
+            self.out = self.frame
+            self.seq, self.stamp = self.latest_seq, self.latest_stamp
+            frame = self.frame
+        if out is not None and out.shape == frame.shape and out.dtype == frame.dtype:
+            np.copyto(out, frame)
+            frame = out
+        return True, frame, self.seq, self.stamp
+
+    def latency(self):
+        """Seconds since the last handed‑out frame came off the decoder."""
+        return time.time() - self.stamp if self.stamp else 0.0
+
+    def get(self, prop):
+        return self.cap.get(prop)
+
+    def set(self, prop, value):
+        return self.cap.set(prop, value)
+
+    def release(self):
+        with self.cond:
+            self.running = False
+            self.cond.notify_all()
+        if self.thread.is_alive():
+            self.thread.join(timeout=2.0)   # a stalled RTMP read may never return
+        with self.cond:                     # still inside cap.read(): the loop releases on exit
+            self.orphaned = not self.done
+        if not self.orphaned:
+            self.cap.release()
+
+
+# ── Factory ────────────────────────────────────────────────────────
+def open_capture(url=RTMP_URL, size=None, backend=None):
+    """Open `url` (or $DRONE_SOURCE if set) behind a latest‑frame grabber.
+
+    `size` = (w, h) delivers frames already scaled: inside ffmpeg for the
+    "ffmpeg" backend, on the decode thread for "opencv".  shm://<name> attaches
+    to a running frame_bus.py publisher instead of opening the stream again; a
+    path to a recorded clip is replayed by replay_source.FileReplaySource.
+    """
+    url     = os.environ.get(SOURCE_ENV, url)
+    if url.startswith(BUS_SCHEME):
+        from frame_bus import FrameBusReader
+        return FrameBusReader(url[len(BUS_SCHEME):], size=size)
+    if os.path.isfile(url):
+        from replay_source import FileReplaySource, RATE_ENV
+        return FileReplaySource(url, rate=os.environ.get(RATE_ENV, "pts"), size=size)
+    backend = backend or os.environ.get(BACKEND_ENV, "opencv")
+    if backend == "ffmpeg":
+        from ffmpeg_source import FFmpegPipeSource
+        return LatestFrameGrabber(FFmpegPipeSource(url, size=size))
+    if backend != "opencv":
+        raise ValueError(f"unknown video backend {backend!r}")
+    return LatestFrameGrabber(url, size=size)
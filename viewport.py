@@ -0,0 +1,68 @@
+"""
+Display‑sized rendering for HighGUI panes
+Instead of drawing on (or upscaling to) a full‑res frame and letting
+cv2.imshow scale it down, each pane is rendered straight at the size it
+occupies on screen: one resize of the source into a reused buffer, overlays
+drawn in display coordinates, and mouse clicks (which arrive in display
+coordinates) mapped back to source pixels.
+
+    view = Viewport("Live", (960, 540))
+    live = view.render(frame)                   # display‑sized copy of frame
+    cv2.rectangle(live, view.to_disp(x1, y1), view.to_disp(x2, y2), …)
+    sx, sy = view.to_src(x, y)                  # in the mouse callback
+"""
+
+import cv2
+import numpy as np
+
+
+class Viewport:
+    """Maps between a source image and the pane it is shown in.
+
+    The pane size follows the window's current image rect when the HighGUI
+    backend reports one (the user resized the window), else `size`.  HighGUI
+    is main‑thread only: code running on a worker reads poll() on the main
+    thread first and passes the result as `size`.
+    """
+
+    def __init__(self, window, size):
+        self.window  = window
+        self.default = size
+        self.size    = size
+        self.src     = size
+        self.buf     = None
+
+    def poll(self):
+        """The window's current pane size (call on the HighGUI thread)."""
+        w, h = cv2.getWindowImageRect(self.window)[2:]
+        return (w, h) if w > 0 and h > 0 else self.default
+
+    def update(self, src_w, src_h, size=None):
+        """Refresh the pane size for a source of src_w × src_h; returns it.
+        `size` = a pane size polled earlier, instead of asking the window."""
+        self.size = size or self.poll()
+        self.src  = (src_w, src_h)
+        return self.size
+
+    @property
+    def scale(self):
+        """(sx, sy): display pixels per source pixel."""
+        return self.size[0] / self.src[0], self.size[1] / self.src[1]
+
+    def to_disp(self, x, y):
+        sx, sy = self.scale
+        return int(round(x * sx)), int(round(y * sy))
+
+    def to_src(self, x, y):
+        sx, sy = self.scale
+        return (min(int(x / sx), self.src[0] - 1),
+                min(int(y / sy), self.src[1] - 1))
+
+    def render(self, img, interpolation=cv2.INTER_LINEAR, size=None):
+        """img resized to the pane into a buffer owned by the viewport."""
+        h, w = img.shape[:2]
+        self.update(w, h, size)
+        shape = (self.size[1], self.size[0]) + img.shape[2:]
+        if self.buf is None or self.buf.shape != shape:
+            self.buf = np.empty(shape, img.dtype)
+        return cv2.resize(img, self.size, dst=self.buf, interpolation=interpolation)
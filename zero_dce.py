@@ -0,0 +1,116 @@
+"""
+Zero‑DCE low‑light enhancement on the CPU (zerodce.onnx)
+The network only predicts light‑enhancement curves, and those curves are smooth,
+so it runs on a heavily downscaled copy of the frame.  The result is turned into
+a per‑pixel gain map that is upsampled and applied to the full‑res frame, and
+the map is reused for a few frames while the scene stays stable.
+
+    dce = ZeroDCE("zerodce.onnx")
+    out = dce.enhance(frame)            # BGR uint8, same size as frame
+
+Model outputs understood: the 24‑channel curve‑parameter map r (8 iterations ×
+RGB, as in the reference export) or, failing that, the 3‑channel enhanced image.
+Runs through onnxruntime when it is installed, otherwise cv2.dnn.
+"""
+
+import os
+import cv2
+import numpy as np
+
+try:
+    import onnxruntime as ort
+except ImportError:         # optional — cv2.dnn is the fallback
+    ort = None
+
+MODEL_PATH  = "zerodce.onnx"
+INFER_W     = 160           # inference width (height follows the frame aspect)
+REUSE_MAX   = 5             # reuse the gain map for up to N frames …
+REUSE_DIFF  = 4.0           # … while mean |Δ| of the tiny gray frame stays below this
+MAX_GAIN    = 8.0
+
+
+def apply_curves(x, r):
+    """LE(x) = x + α·x·(1 − x), iterated once per 3‑channel slice of r."""
+    for i in range(0, r.shape[0], 3):
+        x = x + r[i:i + 3] * (x * (1.0 - x))
+    return x
+
+
+class ZeroDCE:
+    """Learned low‑light curves inferred at low res, applied as a gain map.
+
+    apply="gain" (default) multiplies the full‑res frame by the upsampled
+    LE(x)/x map; apply="curves" upsamples the 24 curve maps and iterates the
+    curves on the full frame (exact, several times slower).
+    """
+
+    def __init__(self, model_path=MODEL_PATH, infer_w=INFER_W, apply="gain",
+                 reuse_max=REUSE_MAX, reuse_diff=REUSE_DIFF, backend="auto"):
+        if not os.path.isfile(model_path) or os.path.getsize(model_path) < 1024:
+            raise RuntimeError(f"'{model_path}' is missing or not a real ONNX model")
+        self.infer_w, self.apply = infer_w, apply
+        self.reuse_max, self.reuse_diff = reuse_max, reuse_diff
+        self.static_hw = None
+        if backend == "onnxruntime" or (backend == "auto" and ort is not None):
+            self.sess = ort.InferenceSession(model_path, providers=["CPUExecutionProvider"])
+            self.input_name = self.sess.get_inputs()[0].name
+            h, w = self.sess.get_inputs()[0].shape[2:4]
+            if isinstance(h, int) and isinstance(w, int):
+                self.static_hw = (h, w)
+            self.net = None
+        else:
+            self.net  = cv2.dnn.readNetFromONNX(model_path)
+            self.sess = None
+        self.gain = self.curves = self.key = None
+        self.age  = 0
+        self.out  = None
+
+    # ── inference ─────────────────────────────────────────────────
+    def _infer_size(self, frame):
+        if self.static_hw:
+            return self.static_hw[::-1]
+        h, w = frame.shape[:2]
+        return self.infer_w, max(8, round(self.infer_w * h / w))
+
+    def _forward(self, blob):
+        if self.sess is not None:
+            return self.sess.run(None, {self.input_name: blob})
+        self.net.setInput(blob)
+        return self.net.forward(self.net.getUnconnectedOutLayersNames())
+
+    def _estimate(self, small):
+        """small: BGR uint8 at inference size → (gain HxWx3, curves 24xHxW | None)."""
+        blob = cv2.dnn.blobFromImage(small, 1 / 255.0, swapRB=True)   # 1×3×H×W RGB
+        outs = [np.asarray(o) for o in self._forward(blob)]
+        x    = blob[0]
+        curves = next((o[0] for o in outs if o.ndim == 4 and o.shape[1] == 24), None)
+        if curves is not None:
+            enhanced = apply_curves(x, curves)
+        else:
+            enhanced = next(o[0] for o in outs if o.ndim == 4 and o.shape[1] == 3)
+        gain = np.clip(enhanced / np.maximum(x, 1 / 255.0), 0, MAX_GAIN)
+        return gain[::-1].transpose(1, 2, 0).copy(), curves                # RGB→BGR, HWC
+
+    # ── full‑res application ──────────────────────────────────────
+    def enhance(self, frame):
+        small = cv2.resize(frame, self._infer_size(frame), interpolation=cv2.INTER_AREA)
+        key   = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY).astype(np.float32)
+        stale = (self.gain is None or self.age >= self.reuse_max
+                 or key.shape != self.key.shape
+                 or float(np.mean(np.abs(key - self.key))) > self.reuse_diff)
+        if stale:
+            self.gain, self.curves = self._estimate(small)
+            self.key, self.age = key, 0
+        self.age += 1
+
+        h, w = frame.shape[:2]
+        if self.apply == "curves" and self.curves is not None:
+            r = cv2.resize(self.curves.transpose(1, 2, 0), (w, h))       # H×W×24
+            x = frame[..., ::-1].astype(np.float32) / 255.0
+            x = apply_curves(x.transpose(2, 0, 1), r.transpose(2, 0, 1))
+            return np.clip(x[::-1].transpose(1, 2, 0) * 255.0, 0, 255).astype(np.uint8)
+
+        gain = cv2.resize(self.gain, (w, h), interpolation=cv2.INTER_LINEAR)
+        if self.out is None or self.out.shape != frame.shape:
+            self.out = np.empty_like(frame)
+        return cv2.multiply(frame, gain, dst=self.out, dtype=cv2.CV_8U)